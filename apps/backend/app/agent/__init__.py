@@ -4,5 +4,6 @@
 # * Other providers can be configured via LLM_PROVIDER setting.
 
 from .manager import AgentManager, EmbeddingManager
+from .registry import client_registry
 
-__all__ = ["AgentManager", "EmbeddingManager"]
+__all__ = ["AgentManager", "EmbeddingManager", "client_registry"]
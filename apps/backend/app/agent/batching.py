@@ -0,0 +1,85 @@
+import asyncio
+import logging
+
+from typing import Awaitable, Callable, Dict, Hashable, List, Set, Tuple
+
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Dispatch = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class _Batch:
+    __slots__ = ("dispatch", "items", "timer")
+
+    def __init__(self, dispatch: Dispatch) -> None:
+        self.dispatch = dispatch
+        self.items: List[Tuple[str, "asyncio.Future[List[float]]"]] = []
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class EmbeddingBatcher:
+    """
+    Collects embed requests issued concurrently (typically by different HTTP
+    requests) for up to `max_wait_ms` and sends them as one `embed_many` call.
+
+    Requests are grouped by a caller-supplied key (model, dimensions, API
+    key); a batch is flushed when it reaches `max_batch_size` or when its
+    wait window elapses, whichever comes first.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: float) -> None:
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._open: Dict[Hashable, _Batch] = {}
+        self._inflight: Set["asyncio.Task[None]"] = set()
+
+    async def submit(self, group: Hashable, text: str, dispatch: Dispatch) -> List[float]:
+        loop = asyncio.get_running_loop()
+        batch = self._open.get(group)
+        if batch is None:
+            batch = _Batch(dispatch)
+            self._open[group] = batch
+            batch.timer = loop.call_later(self.max_wait, self._flush, group, batch)
+
+        future: "asyncio.Future[List[float]]" = loop.create_future()
+        batch.items.append((text, future))
+        if len(batch.items) >= self.max_batch_size:
+            self._flush(group, batch)
+        return await future
+
+    def _flush(self, group: Hashable, batch: _Batch) -> None:
+        if self._open.get(group) is batch:
+            del self._open[group]
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: _Batch) -> None:
+        texts = list(dict.fromkeys(text for text, _ in batch.items))
+        metrics.incr("embedding_batcher.batches")
+        metrics.incr("embedding_batcher.items", len(batch.items))
+        metrics.set_gauge("embedding_batcher.last_batch_size", len(texts))
+        try:
+            vectors = await batch.dispatch(texts)
+            if len(vectors) != len(texts):
+                raise ValueError(
+                    f"Embedding provider returned {len(vectors)} vectors for {len(texts)} texts"
+                )
+            by_text = dict(zip(texts, vectors))
+            for text, future in batch.items:
+                if not future.done():
+                    future.set_result(by_text[text])
+        except Exception as e:
+            metrics.incr("embedding_batcher.errors")
+            for _, future in batch.items:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Never leave a caller waiting, e.g. if this task was cancelled.
+            for _, future in batch.items:
+                if not future.done():
+                    future.cancel()
@@ -0,0 +1,325 @@
+import copy
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+
+from functools import lru_cache
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..core import settings
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Small in-memory LRU map. Not thread-safe; meant to be used from the event loop.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return default
+        return self._data[key]
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+def _connect_sqlite(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    return conn
+
+
+def embedding_cache_key(model: str, dimensions: Optional[int], text: str) -> str:
+    """
+    Content address of an embedding: sha256 over (model, dimensions, text).
+    """
+    payload = json.dumps([model, dimensions, text], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier, content-addressed embedding cache.
+
+    * An in-memory LRU holds the hottest vectors.
+    * A SQLite table persists every vector as a float32 blob, so embeddings
+      survive restarts and are shared between workers on the same node.
+
+    Lookups and writes are plain local SQLite primary-key operations and are
+    executed inline; they are orders of magnitude cheaper than the provider
+    round trip they replace. The LRU holds tuples and hands out fresh lists,
+    so callers can mutate what they get back.
+    """
+
+    def __init__(self, path: Optional[str], max_entries: int) -> None:
+        self._memory = LRUCache(max_entries)
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            try:
+                self._conn = _connect_sqlite(path)
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS embedding_cache (
+                        key TEXT PRIMARY KEY,
+                        model TEXT NOT NULL,
+                        dimensions INTEGER,
+                        vector BLOB NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                    """
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache disk tier disabled ({path}): {e}")
+                self._conn = None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """
+        Returns the cached vectors for the given keys; missing keys are omitted.
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        pending: List[str] = []
+        for key in keys:
+            vector = self._memory.get(key)
+            if vector is not None:
+                found[key] = list(vector)
+            else:
+                pending.append(key)
+
+        if pending and self._conn is not None:
+            placeholders = ",".join("?" for _ in pending)
+            try:
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embedding_cache WHERE key IN ({placeholders})",
+                    pending,
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache read failed: {e}")
+                rows = []
+            for key, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32).tolist()
+                self._memory.set(key, tuple(vector))
+                found[key] = vector
+            metrics.incr("embedding_cache.disk_hits", len(rows))
+
+        metrics.incr("embedding_cache.hits", len(found))
+        metrics.incr("embedding_cache.misses", len(keys) - len(found))
+        return found
+
+    def get(self, key: str) -> Optional[List[float]]:
+        return self.get_many([key]).get(key)
+
+    def set_many(
+        self, items: Iterable[Tuple[str, List[float]]], model: str, dimensions: Optional[int]
+    ) -> None:
+        rows = []
+        now = time.time()
+        for key, vector in items:
+            self._memory.set(key, tuple(vector))
+            blob = np.asarray(vector, dtype=np.float32).tobytes()
+            rows.append((key, model, dimensions, blob, now))
+
+        if rows and self._conn is not None:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (key, model, dimensions, vector, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding cache write failed: {e}")
+
+    def set(
+        self, key: str, vector: List[float], model: str, dimensions: Optional[int]
+    ) -> None:
+        self.set_many([(key, vector)], model=model, dimensions=dimensions)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_entries": len(self._memory),
+            "hits": metrics.get("embedding_cache.hits"),
+            "disk_hits": metrics.get("embedding_cache.disk_hits"),
+            "misses": metrics.get("embedding_cache.misses"),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_embedding_cache() -> EmbeddingCache:
+    """Create (or return) the process-wide embedding cache."""
+    return EmbeddingCache(
+        path=settings.CACHE_DB_PATH,
+        max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+    )
+
+
+def response_cache_key(
+    model: str, strategy: str, prompt: str, generation_opts: Dict[str, Any]
+) -> str:
+    """
+    Cache key of an LLM response: (model, strategy, prompt hash, generation opts).
+    """
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    payload = json.dumps(
+        [model, strategy, prompt_hash, generation_opts], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier cache of parsed LLM responses with TTL and size-based eviction.
+
+    Entries live in an in-memory LRU and, when a path is configured, in a
+    SQLite table that is pruned to `max_disk_entries` rows (oldest first).
+    Values must be JSON-serialisable (the strategies return dicts or strings).
+    Values are copied on the way in and out, so callers may mutate them.
+    """
+
+    _PRUNE_EVERY = 64
+
+    def __init__(
+        self,
+        path: Optional[str],
+        ttl_seconds: int,
+        max_entries: int,
+        max_disk_entries: int,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self._memory = LRUCache(max_entries)
+        self._writes = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            try:
+                self._conn = _connect_sqlite(path)
+                self._conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS llm_response_cache (
+                        key TEXT PRIMARY KEY,
+                        task TEXT,
+                        value TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                    """
+                )
+                self._conn.execute(
+                    "CREATE INDEX IF NOT EXISTS ix_llm_response_cache_created_at "
+                    "ON llm_response_cache (created_at)"
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache disk tier disabled ({path}): {e}")
+                self._conn = None
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > now:
+                metrics.incr("llm_cache.hits")
+                return copy.deepcopy(value)
+            self._memory.pop(key)
+
+        if self._conn is not None:
+            try:
+                row = self._conn.execute(
+                    "SELECT value, expires_at FROM llm_response_cache WHERE key = ?",
+                    (key,),
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache read failed: {e}")
+                row = None
+            if row is not None and row[1] > now:
+                value = json.loads(row[0])
+                self._memory.set(key, (row[1], value))
+                metrics.incr("llm_cache.hits")
+                metrics.incr("llm_cache.disk_hits")
+                return copy.deepcopy(value)
+
+        metrics.incr("llm_cache.misses")
+        return None
+
+    def set(self, key: str, value: Any, task: Optional[str] = None) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        # Callers may mutate the value they hold; keep a private copy.
+        self._memory.set(key, (expires_at, copy.deepcopy(value)))
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_response_cache (key, task, value, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, task, json.dumps(value), now, expires_at),
+            )
+            self._writes += 1
+            if self._writes % self._PRUNE_EVERY == 0:
+                self._prune(now)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"LLM response cache write failed: {e}")
+
+    def delete(self, key: str) -> None:
+        self._memory.pop(key)
+        if self._conn is not None:
+            try:
+                self._conn.execute("DELETE FROM llm_response_cache WHERE key = ?", (key,))
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache delete failed: {e}")
+
+    def _prune(self, now: float) -> None:
+        """Drops expired rows, then the oldest rows above the size limit."""
+        self._conn.execute("DELETE FROM llm_response_cache WHERE expires_at <= ?", (now,))
+        self._conn.execute(
+            """
+            DELETE FROM llm_response_cache WHERE key IN (
+                SELECT key FROM llm_response_cache
+                ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_disk_entries,),
+        )
+        metrics.incr("llm_cache.prunes")
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache:
+    """Create (or return) the process-wide LLM response cache."""
+    return ResponseCache(
+        path=settings.CACHE_DB_PATH,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+        max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+        max_disk_entries=settings.LLM_CACHE_MAX_DISK_ENTRIES,
+    )
@@ -1,10 +1,31 @@
 import os
-from typing import Dict, Any
+import copy
+import logging
+from typing import Any, Callable, Dict
 
 from ..core import settings
+from .cache import (
+    embedding_cache_key,
+    get_embedding_cache,
+    get_response_cache,
+    response_cache_key,
+)
+from .batching import EmbeddingBatcher
+from .singleflight import SingleFlight
 from .strategies.wrapper import JSONWrapper, MDWrapper
 from .providers.base import Provider, EmbeddingProvider
 
+logger = logging.getLogger(__name__)
+
+# Process-wide: identical requests issued concurrently by different managers
+# (i.e. different HTTP requests) share one provider call.
+_llm_calls = SingleFlight("llm")
+_embedding_calls = SingleFlight("embedding")
+_embedding_batcher = EmbeddingBatcher(
+    max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+    max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+)
+
 class AgentManager:
     def __init__(self,
                  strategy: str | None = None,
@@ -14,10 +35,13 @@ class AgentManager:
         match strategy:
             case "md":
                 self.strategy = MDWrapper()
+                self.strategy_name = "md"
             case "json":
                 self.strategy = JSONWrapper()
+                self.strategy_name = "json"
             case _:
                 self.strategy = JSONWrapper()
+                self.strategy_name = "json"
         self.model = model
         self.model_provider = model_provider
 
@@ -37,19 +61,97 @@ class AgentManager:
             case _:
                 raise ValueError(f"Unsupported LLM provider: {self.model_provider}. Only 'openai' is supported.")
 
-    async def run(self, prompt: str, **kwargs: Any) -> Dict[str, Any]:
+    def _response_cache_key(self, prompt: str, **kwargs: Any) -> str:
+        generation_opts = {
+            k: v for k, v in kwargs.items() if not k.endswith("api_key")
+        }
+        return response_cache_key(
+            model=f"{self.model_provider}:{self.model}",
+            strategy=self.strategy_name,
+            prompt=prompt,
+            generation_opts=generation_opts,
+        )
+
+    @staticmethod
+    def _is_cacheable(task: str | None, use_cache: bool) -> bool:
+        return (
+            use_cache
+            and settings.LLM_CACHE_ENABLED
+            and task is not None
+            and task in settings.LLM_CACHE_TASKS
+        )
+
+    async def run(self,
+                  prompt: str,
+                  task: str | None = None,
+                  use_cache: bool = True,
+                  coalesce: bool = True,
+                  on_delta: Callable[[str], None] | None = None,
+                  **kwargs: Any) -> Dict[str, Any]:
         """
         Run the agent with the given prompt and generation arguments.
+
+        `task` names the prompt family (e.g. "structured_resume"); responses
+        for tasks enabled in LLM_CACHE_TASKS are served from the response
+        cache unless `use_cache=False` is passed. Identical calls already in
+        flight are joined rather than repeated unless `coalesce=False`.
+        When `on_delta` is given the provider output is streamed and each
+        text delta is reported to it as it arrives; such calls are never
+        coalesced, since deltas belong to a single caller.
+        """
+        cacheable = self._is_cacheable(task, use_cache)
+        key = self._response_cache_key(prompt, **kwargs)
+        if cacheable:
+            cached = get_response_cache().get(key)
+            if cached is not None:
+                logger.info(f"LLM response cache hit for task '{task}'")
+                return cached
+
+        async def _call() -> Dict[str, Any]:
+            provider = await self._get_provider(**kwargs)
+            if on_delta is not None:
+                result = await self.strategy.stream(prompt, provider, on_delta, **kwargs)
+            else:
+                result = await self.strategy(prompt, provider, **kwargs)
+            if cacheable:
+                get_response_cache().set(key, result, task=task)
+            return result
+
+        if not coalesce or on_delta is not None:
+            return await _call()
+        # Joined callers all receive the same result; give each its own copy.
+        return copy.deepcopy(await _llm_calls.do(key, _call))
+
+    def evict(self, prompt: str, task: str | None = None, **kwargs: Any) -> None:
         """
-        provider = await self._get_provider(**kwargs)
-        return await self.strategy(prompt, provider, **kwargs)
+        Drops a cached response, e.g. when it failed downstream validation.
+        """
+        if self._is_cacheable(task, True):
+            get_response_cache().delete(self._response_cache_key(prompt, **kwargs))
 
 class EmbeddingManager:
     def __init__(self,
                  model: str = settings.EMBEDDING_MODEL,
-                 model_provider: str = settings.EMBEDDING_PROVIDER) -> None:
+                 model_provider: str = settings.EMBEDDING_PROVIDER,
+                 dimensions: int | None = settings.EMBEDDING_DIMENSIONS) -> None:
         self._model = model
         self._model_provider = model_provider
+        self._dimensions = dimensions
+
+    @property
+    def cache_model(self) -> str:
+        """Model identity used to address cached vectors."""
+        if self._model_provider == "onnx":
+            return f"onnx:{settings.EMBEDDING_ONNX_MODEL_PATH}"
+        return f"{self._model_provider}:{self._model}"
+
+    @property
+    def is_local(self) -> bool:
+        """
+        Lexical vectors are cheaper to recompute than to look up, and change
+        when IDF statistics are refitted, so they skip caching and batching.
+        """
+        return self._model_provider == "lexical"
 
     async def _get_embedding_provider(
         self, **kwargs: Any
@@ -58,13 +160,98 @@ class EmbeddingManager:
             case 'openai':
                 from .providers.openai import OpenAIEmbeddingProvider
                 api_key = kwargs.get("openai_api_key", settings.EMBEDDING_API_KEY)
-                return OpenAIEmbeddingProvider(api_key=api_key, embedding_model=self._model)
+                return OpenAIEmbeddingProvider(api_key=api_key,
+                                               embedding_model=self._model,
+                                               dimensions=self._dimensions)
+            case 'onnx':
+                from .providers.onnx import OnnxEmbeddingProvider
+                return OnnxEmbeddingProvider()
+            case 'lexical':
+                from .providers.lexical import get_lexical_provider
+                return get_lexical_provider()
             case _:
-                raise ValueError(f"Unsupported embedding provider: {self._model_provider}. Only 'openai' is supported.")
+                raise ValueError(f"Unsupported embedding provider: {self._model_provider}. Supported: 'openai', 'onnx', 'lexical'.")
 
-    async def embed(self, text: str, **kwargs: Any) -> list[float]:
+    async def embed(self, text: str, use_cache: bool = True, **kwargs: Any) -> list[float]:
         """
         Get the embedding for the given text.
+
+        Vectors are served from the content-addressed embedding cache when
+        possible; pass `use_cache=False` to force a provider round trip.
+        Concurrent requests for the same vector share one provider call, and
+        concurrent requests for different vectors are micro-batched.
+        """
+        if self.is_local:
+            provider = await self._get_embedding_provider(**kwargs)
+            return await provider.embed(text)
+
+        use_cache = use_cache and settings.EMBEDDING_CACHE_ENABLED
+        key = embedding_cache_key(self.cache_model, self._dimensions, text)
+        if use_cache:
+            cached = get_embedding_cache().get(key)
+            if cached is not None:
+                return cached
+
+        async def _call() -> list[float]:
+            if settings.EMBEDDING_BATCH_ENABLED:
+                vector = await _embedding_batcher.submit(
+                    self._batch_group(**kwargs), text, self._dispatch_many(**kwargs)
+                )
+            else:
+                provider = await self._get_embedding_provider(**kwargs)
+                vector = await provider.embed(text)
+            if use_cache:
+                get_embedding_cache().set(
+                    key, vector, model=self.cache_model, dimensions=self._dimensions
+                )
+            return vector
+
+        return await _embedding_calls.do(key, _call)
+
+    async def embed_many(
+        self, texts: list[str], use_cache: bool = True, **kwargs: Any
+    ) -> list[list[float]]:
+        """
+        Get the embeddings for several texts in order, with a single provider
+        call covering every text that is not already cached.
         """
-        provider = await self._get_embedding_provider(**kwargs)
-        return await provider.embed(text)
+        if not texts:
+            return []
+        if self.is_local:
+            provider = await self._get_embedding_provider(**kwargs)
+            return await provider.embed_many(texts)
+
+        use_cache = use_cache and settings.EMBEDDING_CACHE_ENABLED
+        keys = [
+            embedding_cache_key(self.cache_model, self._dimensions, text)
+            for text in texts
+        ]
+        found = get_embedding_cache().get_many(keys) if use_cache else {}
+
+        missing = list(dict.fromkeys(
+            text for text, key in zip(texts, keys) if key not in found
+        ))
+        if missing:
+            provider = await self._get_embedding_provider(**kwargs)
+            vectors = await provider.embed_many(missing)
+            fresh = {
+                embedding_cache_key(self.cache_model, self._dimensions, text): vector
+                for text, vector in zip(missing, vectors)
+            }
+            if use_cache:
+                get_embedding_cache().set_many(
+                    fresh.items(), model=self.cache_model, dimensions=self._dimensions
+                )
+            found.update(fresh)
+
+        return [found[key] for key in keys]
+
+    def _batch_group(self, **kwargs: Any) -> tuple:
+        return (self.cache_model, self._dimensions, kwargs.get("openai_api_key"))
+
+    def _dispatch_many(self, **kwargs: Any):
+        async def dispatch(texts: list[str]) -> list[list[float]]:
+            provider = await self._get_embedding_provider(**kwargs)
+            return await provider.embed_many(texts)
+
+        return dispatch
@@ -1,4 +1,6 @@
-from typing import Any
+import asyncio
+
+from typing import Any, AsyncIterator
 from abc import ABC, abstractmethod
 
 
@@ -10,6 +12,13 @@ class Provider(ABC):
     @abstractmethod
     async def __call__(self, prompt: str, **generation_args: Any) -> str: ...
 
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        """
+        Yields the response text incrementally. Providers without native
+        streaming yield the complete response as a single chunk.
+        """
+        yield await self(prompt, **generation_args)
+
 
 class EmbeddingProvider(ABC):
     """
@@ -18,3 +27,10 @@ class EmbeddingProvider(ABC):
 
     @abstractmethod
     async def embed(self, text: str) -> list[float]: ...
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embeds several texts, preserving order. Providers whose API accepts a
+        list of inputs should override this with a single request.
+        """
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
@@ -0,0 +1,93 @@
+import re
+import logging
+
+from functools import lru_cache
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from .base import EmbeddingProvider
+from ...core import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_NGRAM_SIZES: Tuple[int, ...] = (3, 4, 5)
+_PRIME = np.uint64(1099511628211)
+_MIX = np.uint64(0xFF51AFD7ED558CCD)
+
+
+class LexicalEmbeddingProvider(EmbeddingProvider):
+    """
+    Zero-dependency lexical embeddings: hashed TF-IDF over character n-grams.
+
+    Text is lower-cased and whitespace-collapsed, every 3/4/5-character
+    n-gram is hashed into one of `dimensions` buckets (vectorised with NumPy),
+    counts are log-scaled and weighted by IDF, and the result is L2-normalised
+    so the existing cosine similarity code applies unchanged.
+
+    Without fitted statistics every bucket has IDF 1; `fit` learns document
+    frequencies from a corpus such as the stored jobs and resumes.
+    """
+
+    def __init__(self, dimensions: int = settings.EMBEDDING_LEXICAL_DIMENSIONS) -> None:
+        self.dimensions = dimensions
+        self._idf = np.ones(dimensions, dtype=np.float32)
+        self.fitted_documents = 0
+
+    def _bucket_counts(self, text: str) -> np.ndarray:
+        normalized = f" {_WHITESPACE.sub(' ', text.lower()).strip()} "
+        codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        counts = np.zeros(self.dimensions, dtype=np.float32)
+        for n in _NGRAM_SIZES:
+            windows = len(codes) - n + 1
+            if windows <= 0:
+                continue
+            hashes = np.full(windows, np.uint64(n), dtype=np.uint64)
+            for offset in range(n):
+                hashes = hashes * _PRIME + codes[offset : offset + windows]
+            hashes ^= hashes >> np.uint64(33)
+            hashes *= _MIX
+            hashes ^= hashes >> np.uint64(33)
+            buckets = (hashes % np.uint64(self.dimensions)).astype(np.intp)
+            counts += np.bincount(buckets, minlength=self.dimensions).astype(np.float32)
+        return counts
+
+    def vectorize(self, text: str) -> np.ndarray:
+        counts = self._bucket_counts(text)
+        nonzero = counts > 0
+        weights = np.zeros_like(counts)
+        weights[nonzero] = (1.0 + np.log(counts[nonzero])) * self._idf[nonzero]
+        norm = np.linalg.norm(weights)
+        return weights / norm if norm else weights
+
+    def fit(self, texts: Iterable[str]) -> None:
+        """
+        Learns smoothed IDF weights, idf = ln((1 + N) / (1 + df)) + 1.
+        """
+        document_frequency = np.zeros(self.dimensions, dtype=np.float64)
+        documents = 0
+        for text in texts:
+            if not text:
+                continue
+            document_frequency += self._bucket_counts(text) > 0
+            documents += 1
+        if not documents:
+            return
+        self._idf = (
+            np.log((1.0 + documents) / (1.0 + document_frequency)) + 1.0
+        ).astype(np.float32)
+        self.fitted_documents = documents
+        logger.info(f"Fitted lexical IDF statistics on {documents} documents")
+
+    async def embed(self, text: str) -> list[float]:
+        return self.vectorize(text).tolist()
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        return [self.vectorize(text).tolist() for text in texts]
+
+
+@lru_cache(maxsize=1)
+def get_lexical_provider() -> LexicalEmbeddingProvider:
+    """Process-wide instance, so fitted IDF statistics are shared."""
+    return LexicalEmbeddingProvider()
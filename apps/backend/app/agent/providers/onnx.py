@@ -0,0 +1,160 @@
+import os
+import asyncio
+import logging
+import threading
+
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..exceptions import ProviderError
+from .base import EmbeddingProvider
+from ...core import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxSentenceEncoder:
+    """
+    Sentence-embedding model exported to ONNX, with its Hugging Face
+    `tokenizer.json`.
+
+    `model_path` is either a directory containing `model.onnx` and
+    `tokenizer.json`, or the path to the `.onnx` file itself with
+    `tokenizer.json` next to it. Token embeddings are mean-pooled over the
+    attention mask and L2-normalised, so cosine similarity is a dot product.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        intra_op_threads: int,
+        max_length: int,
+        batch_size: int,
+    ) -> None:
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ProviderError(
+                "ONNX embedding provider requires onnxruntime and tokenizers. "
+                "Install with: pip install onnxruntime tokenizers"
+            ) from e
+
+        if os.path.isdir(model_path):
+            onnx_file = os.path.join(model_path, "model.onnx")
+            tokenizer_file = os.path.join(model_path, "tokenizer.json")
+        else:
+            onnx_file = model_path
+            tokenizer_file = os.path.join(os.path.dirname(model_path), "tokenizer.json")
+        for path in (onnx_file, tokenizer_file):
+            if not os.path.isfile(path):
+                raise ProviderError(f"ONNX embedding provider - file not found: {path}")
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(
+            onnx_file, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {item.name for item in self._session.get_inputs()}
+
+        self._tokenizer = Tokenizer.from_file(tokenizer_file)
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding()
+        self.batch_size = max(1, batch_size)
+        logger.info(f"Loaded ONNX embedding model {onnx_file}")
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self._tokenizer.encode_batch(texts)
+        input_ids = np.asarray([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.asarray([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds: Dict[str, Any] = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self._input_names:
+            feeds["token_type_ids"] = np.asarray(
+                [e.type_ids for e in encodings], dtype=np.int64
+            )
+        feeds = {name: value for name, value in feeds.items() if name in self._input_names}
+
+        output = self._session.run(None, feeds)[0]
+        if output.ndim == 3:
+            mask = attention_mask[..., None].astype(np.float32)
+            summed = (output * mask).sum(axis=1)
+            output = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        norms = np.linalg.norm(output, axis=1, keepdims=True)
+        return (output / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(self._encode_batch(texts[start : start + self.batch_size]).tolist())
+        return vectors
+
+
+_encoders: Dict[str, OnnxSentenceEncoder] = {}
+_encoders_lock = threading.Lock()
+
+
+def load_onnx_encoder(model_path: str) -> OnnxSentenceEncoder:
+    """
+    Loads each ONNX model once per process. Building the session and tokenizer
+    blocks for seconds, so async callers should go through `warm_onnx_encoder`.
+    """
+    with _encoders_lock:
+        encoder = _encoders.get(model_path)
+        if encoder is None:
+            encoder = OnnxSentenceEncoder(
+                model_path=model_path,
+                intra_op_threads=settings.EMBEDDING_ONNX_INTRA_OP_THREADS,
+                max_length=settings.EMBEDDING_ONNX_MAX_LENGTH,
+                batch_size=settings.EMBEDDING_ONNX_BATCH_SIZE,
+            )
+            _encoders[model_path] = encoder
+        return encoder
+
+
+async def warm_onnx_encoder(model_path: str | None = None) -> OnnxSentenceEncoder:
+    """Loads the configured ONNX model in a worker thread, off the event loop."""
+    model_path = model_path or settings.EMBEDDING_ONNX_MODEL_PATH
+    if not model_path:
+        raise ProviderError("ONNX embedding provider - EMBEDDING_ONNX_MODEL_PATH is not set")
+    encoder = _encoders.get(model_path)
+    if encoder is not None:
+        return encoder
+    return await asyncio.to_thread(load_onnx_encoder, model_path)
+
+
+@lru_cache(maxsize=1)
+def _inference_executor() -> ThreadPoolExecutor:
+    """Dedicated pool so inference never competes with the default executor."""
+    return ThreadPoolExecutor(
+        max_workers=settings.EMBEDDING_ONNX_POOL_SIZE,
+        thread_name_prefix="onnx-embed",
+    )
+
+
+class OnnxEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, model_path: str | None = None):
+        model_path = model_path or settings.EMBEDDING_ONNX_MODEL_PATH
+        if not model_path:
+            raise ProviderError("ONNX embedding provider - EMBEDDING_ONNX_MODEL_PATH is not set")
+        self._model_path = model_path
+        self._encoder: OnnxSentenceEncoder | None = None
+
+    async def embed(self, text: str) -> list[float]:
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        if self._encoder is None:
+            self._encoder = await warm_onnx_encoder(self._model_path)
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                _inference_executor(), self._encoder.encode, list(texts)
+            )
+        except Exception as e:
+            raise ProviderError(f"ONNX - error generating embeddings: {e}") from e
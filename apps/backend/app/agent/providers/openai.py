@@ -1,11 +1,10 @@
 import os
 import logging
 
-from openai import OpenAI
-from typing import Any, Dict
-from fastapi.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Dict
 
 from ..exceptions import ProviderError
+from ..registry import client_registry
 from .base import Provider, EmbeddingProvider
 from ...core import settings
 
@@ -14,22 +13,24 @@ logger = logging.getLogger(__name__)
 
 class OpenAIProvider(Provider):
     def __init__(self, api_key: str | None = None, model_name: str = settings.LL_MODEL,
-                 opts: Dict[str, Any] = None):
+                 opts: Dict[str, Any] = None, base_url: str | None = None):
         if opts is None:
             opts = {}
         api_key = api_key or settings.LLM_API_KEY or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ProviderError("OpenAI API key is missing")
-        self._client = OpenAI(api_key=api_key)
+        self._client = client_registry.get_openai(
+            api_key=api_key, base_url=base_url or settings.LLM_BASE_URL
+        )
         self.model = model_name
         self.opts = opts
         self.instructions = ""
         self.service_tier = "priority"
         
 
-    def _generate_sync(self, prompt: str, options: Dict[str, Any]) -> str:
+    async def _generate(self, prompt: str, options: Dict[str, Any]) -> str:
         try:
-            response = self._client.responses.create(
+            response = await self._client.responses.create(
                 model=self.model,
                 instructions=self.instructions,
                 service_tier=self.service_tier,
@@ -40,7 +41,7 @@ class OpenAIProvider(Provider):
         except Exception as e:
             raise ProviderError(f"OpenAI - error generating response: {e}") from e
 
-    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+    def _options(self, generation_args: Dict[str, Any]) -> Dict[str, Any]:
         if generation_args:
             logger.warning(f"OpenAIProvider - generation_args not used {generation_args}")
         allowed = {
@@ -58,26 +59,78 @@ class OpenAIProvider(Provider):
             if value is not None:
                 myopts[key] = value
         myopts.update({k: v for k, v in generation_args.items() if k in allowed and v is not None})
-        return await run_in_threadpool(self._generate_sync, prompt, myopts)
+        return myopts
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        return await self._generate(prompt, self._options(generation_args))
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        options = self._options(generation_args)
+        try:
+            events = await self._client.responses.create(
+                model=self.model,
+                instructions=self.instructions,
+                service_tier=self.service_tier,
+                input=prompt,
+                stream=True,
+                **options,
+            )
+            async for event in events:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+                elif event.type in ("response.failed", "error"):
+                    raise ProviderError(f"OpenAI - streaming failed: {event}")
+        except ProviderError:
+            raise
+        except Exception as e:
+            raise ProviderError(f"OpenAI - error streaming response: {e}") from e
 
 
 class OpenAIEmbeddingProvider(EmbeddingProvider):
+    # The embeddings endpoint accepts at most 2048 inputs per request.
+    MAX_INPUTS_PER_REQUEST = 2048
+
     def __init__(
         self,
         api_key: str | None = None,
         embedding_model: str = settings.EMBEDDING_MODEL,
+        base_url: str | None = None,
+        dimensions: int | None = None,
     ):
         api_key = api_key or settings.EMBEDDING_API_KEY or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ProviderError("OpenAI API key is missing")
-        self._client = OpenAI(api_key=api_key)
+        self._client = client_registry.get_openai(
+            api_key=api_key, base_url=base_url or settings.EMBEDDING_BASE_URL
+        )
         self._model = embedding_model
+        self._dimensions = dimensions
 
     async def embed(self, text: str) -> list[float]:
+        options: Dict[str, Any] = {}
+        if self._dimensions:
+            options["dimensions"] = self._dimensions
         try:
-            response = await run_in_threadpool(
-                self._client.embeddings.create, input=text, model=self._model
+            response = await self._client.embeddings.create(
+                input=text, model=self._model, **options
             )
             return response.data[0].embedding
         except Exception as e:
             raise ProviderError(f"OpenAI - error generating embedding: {e}") from e
+
+    async def embed_many(self, texts: list[str]) -> list[list[float]]:
+        options: Dict[str, Any] = {}
+        if self._dimensions:
+            options["dimensions"] = self._dimensions
+        vectors: list[list[float]] = []
+        try:
+            for start in range(0, len(texts), self.MAX_INPUTS_PER_REQUEST):
+                chunk = texts[start : start + self.MAX_INPUTS_PER_REQUEST]
+                response = await self._client.embeddings.create(
+                    input=chunk, model=self._model, **options
+                )
+                ordered = sorted(response.data, key=lambda item: item.index)
+                vectors.extend(item.embedding for item in ordered)
+            return vectors
+        except Exception as e:
+            raise ProviderError(f"OpenAI - error generating embeddings: {e}") from e
@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Any, Dict, Tuple
+
+from ..core import settings
+
+logger = logging.getLogger(__name__)
+
+ClientKey = Tuple[str, str, str | None]
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of native async SDK clients.
+
+    One client (and therefore one keep-alive HTTP connection pool) is kept per
+    (provider, api key, base URL) so that providers can be built cheaply on
+    every call without paying a fresh TLS handshake.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[ClientKey, Any] = {}
+        # Dropped clients may still be serving in-flight requests; each one is
+        # closed by its own task once LLM_HTTP_RETIRED_CLIENT_GRACE has passed.
+        self._retired: Dict[asyncio.Task, Tuple[ClientKey, Any]] = {}
+
+    def get_openai(self, api_key: str, base_url: str | None = None) -> Any:
+        """
+        Returns the shared `AsyncOpenAI` client for the given credentials,
+        creating it on first use.
+        """
+        base_url = base_url or None
+        key: ClientKey = ("openai", api_key, base_url)
+        client = self._clients.get(key)
+        if client is None:
+            import httpx
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=settings.LLM_HTTP_TIMEOUT,
+            )
+            client = AsyncOpenAI(
+                api_key=api_key, base_url=base_url, http_client=http_client
+            )
+            self._clients[key] = client
+            logger.info(f"Created pooled AsyncOpenAI client (base_url={base_url})")
+        return client
+
+    async def invalidate(self, provider: str | None = None) -> None:
+        """
+        Drops cached clients, e.g. after an API key change, so the next call
+        builds a new one. When `provider` is given only that provider's
+        clients are dropped. They are closed after a grace period, so
+        requests already using them finish normally.
+        """
+        stale = [
+            key for key in self._clients if provider is None or key[0] == provider
+        ]
+        for key in stale:
+            client = self._clients.pop(key)
+            task = asyncio.create_task(
+                self._close_after(key, client, settings.LLM_HTTP_RETIRED_CLIENT_GRACE)
+            )
+            self._retired[task] = (key, client)
+            task.add_done_callback(lambda t: self._retired.pop(t, None))
+
+    @staticmethod
+    async def _close(key: ClientKey, client: Any) -> None:
+        try:
+            await client.close()
+        except Exception as e:
+            logger.warning(f"Failed to close {key[0]} client: {e}")
+
+    async def _close_after(self, key: ClientKey, client: Any, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._close(key, client)
+        logger.info(f"Closed retired {key[0]} client")
+
+    async def aclose(self) -> None:
+        """
+        Closes every cached and dropped client. Called on application shutdown.
+        """
+        await self.invalidate()
+        retired, self._retired = self._retired, {}
+        for task, (key, client) in retired.items():
+            if task.cancel():
+                await self._close(key, client)
+
+
+client_registry = ClientRegistry()
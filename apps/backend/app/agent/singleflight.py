@@ -0,0 +1,64 @@
+import asyncio
+import logging
+
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+from ..core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Any]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a request key into one execution.
+
+    The first caller for a key starts the work in its own task; later callers
+    with the same key await that task instead of starting another one. Each
+    caller awaits through `asyncio.shield`, so a caller that is cancelled (for
+    example because its client disconnected) only stops waiting. The shared
+    work is cancelled only when every caller waiting on it is gone.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[str, _Call] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _task: self._forget(key, call))
+            metrics.incr(f"singleflight.{self.name}.calls")
+        else:
+            metrics.incr(f"singleflight.{self.name}.coalesced")
+            logger.debug(f"single-flight '{self.name}': joined in-flight call {key[:12]}")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every interested caller went away; stop the shared work and
+                # make sure new callers start a fresh execution.
+                self._forget(key, call)
+                call.task.cancel()
+                metrics.incr(f"singleflight.{self.name}.abandoned")
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
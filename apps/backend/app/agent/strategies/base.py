@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
 from ..providers.base import Provider
 
@@ -21,3 +21,17 @@ class Strategy(ABC):
             Dict[str, Any]: The generated response and any additional information.
         """
         ...
+
+    async def stream(
+        self,
+        prompt: str,
+        provider: Provider,
+        on_delta: Callable[[str], None],
+        **generation_args: Any,
+    ) -> Any:
+        """
+        Like `__call__`, but reports raw text deltas to `on_delta` while the
+        provider generates. Strategies that need the complete response before
+        they can return anything (e.g. JSON parsing) fall back to `__call__`.
+        """
+        return await self(prompt, provider, **generation_args)
@@ -1,7 +1,7 @@
 import json
 import logging
 import re
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
 from .base import Strategy
 from ..providers.base import Provider
@@ -82,6 +82,27 @@ class MDWrapper(Strategy):
         """
         logger.info(f"prompt given to provider: \n{prompt}")
         response = await provider(prompt, **generation_args)
+        return self._wrap(response)
+
+    async def stream(
+        self,
+        prompt: str,
+        provider: Provider,
+        on_delta: Callable[[str], None],
+        **generation_args: Any,
+    ) -> Dict[str, Any]:
+        """
+        Passes the provider's token deltas through to `on_delta` and returns
+        the assembled Markdown once generation finishes.
+        """
+        logger.info(f"prompt given to provider (streaming): \n{prompt}")
+        chunks: List[str] = []
+        async for delta in provider.stream(prompt, **generation_args):
+            chunks.append(delta)
+            on_delta(delta)
+        return self._wrap("".join(chunks))
+
+    def _wrap(self, response: str) -> str:
         logger.info(f"provider response: {response}")
         try:
             response = (
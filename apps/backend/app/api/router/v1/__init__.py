@@ -4,6 +4,9 @@ from .job import job_router
 from .resume import resume_router
 from .config import config_router
 from .schedule import schedule_router
+from .metrics import metrics_router
+from .tasks import tasks_router
+from .health import health_router
 from .auth import router as auth_router
 
 v1_router = APIRouter(prefix="/api/v1", tags=["v1"])
@@ -12,6 +15,9 @@ v1_router.include_router(resume_router, prefix="/resumes")
 v1_router.include_router(job_router, prefix="/jobs")
 v1_router.include_router(config_router)
 v1_router.include_router(schedule_router, prefix="/schedule")
+v1_router.include_router(metrics_router)
+v1_router.include_router(tasks_router)
+v1_router.include_router(health_router)
 
 
 __all__ = ["v1_router"]
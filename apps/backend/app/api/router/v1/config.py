@@ -3,6 +3,7 @@ from pathlib import Path
 
 from fastapi import APIRouter, HTTPException, status
 
+from app.agent import client_registry
 from app.core.config import settings
 from app.schemas.pydantic import LLMApiKeyResponse, LLMApiKeyUpdate
 
@@ -59,6 +60,8 @@ async def update_llm_api_key(payload: LLMApiKeyUpdate) -> LLMApiKeyResponse:
         settings.LLM_API_KEY = clean_value  # type: ignore[attr-defined]
         os.environ["LLM_API_KEY"] = clean_value
         os.environ["OPENAI_API_KEY"] = clean_value
+        # Pooled clients are keyed by API key; drop the ones built with the old key.
+        await client_registry.invalidate("openai")
         return LLMApiKeyResponse(api_key=clean_value)
     except OSError as exc:
         raise HTTPException(
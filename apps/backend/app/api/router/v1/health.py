@@ -0,0 +1,45 @@
+import logging
+
+from uuid import uuid4
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import JSONResponse
+
+from app.core import get_db_session
+from app.services import get_document_converter
+
+health_router = APIRouter(prefix="/health", tags=["health"])
+logger = logging.getLogger(__name__)
+
+
+@health_router.get("/ready", summary="Readiness: database and document conversion")
+async def readiness(request: Request, db: AsyncSession = Depends(get_db_session)):
+    """
+    Returns 200 once startup has finished: the database answers and the
+    document converters are built. The PDF/DOCX support found by the
+    startup probe is reported too. Returns 503 otherwise.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+
+    try:
+        await db.execute(text("SELECT 1"))
+        database = True
+    except Exception as e:
+        logger.error(f"Readiness database check failed: {e}")
+        database = False
+
+    conversion = get_document_converter().status()
+    ready = database and conversion["ready"]
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "request_id": request_id,
+            "data": {
+                "ready": ready,
+                "database": database,
+                "document_conversion": conversion,
+            },
+        },
+        headers={"X-Request-ID": request_id},
+    )
@@ -25,6 +25,9 @@ async def upload_job(
     request: Request,
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_user_optional),
+    defer: bool = Query(
+        False, description="Return once stored and extract the structured job in a background task"
+    ),
 ):
     """
     Accepts a job description as a MarkDown text and stores it in the database.
@@ -52,7 +55,9 @@ async def upload_job(
         job_service = JobService(db)
         # Get user_id if user is authenticated, None for guest uploads
         user_id = str(current_user.id) if current_user else None
-        job_ids = await job_service.create_and_store_job(payload.model_dump(), user_id=user_id)
+        job_ids = await job_service.create_and_store_job(
+            payload.model_dump(), user_id=user_id, defer_extraction=defer
+        )
 
     except AssertionError as e:
         raise HTTPException(
@@ -0,0 +1,19 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.agent.cache import get_embedding_cache
+from app.core.metrics import metrics
+
+
+metrics_router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@metrics_router.get("", summary="Process-wide performance counters")
+async def get_metrics() -> Dict[str, Any]:
+    """
+    Returns the counters, gauges and derived hit rates collected by this worker.
+    """
+    snapshot = metrics.snapshot()
+    snapshot["embedding_cache"] = get_embedding_cache().stats()
+    return snapshot
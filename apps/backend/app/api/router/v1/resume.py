@@ -1,7 +1,10 @@
+import json
+import asyncio
 import logging
 import traceback
 
 from uuid import uuid4
+from typing import Literal
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi import (
@@ -15,7 +18,8 @@ from fastapi import (
     Query,
 )
 
-from app.core import get_db_session
+from app.core import get_db_session, settings
+from app.core.database import AsyncSessionLocal
 from app.core.auth_dependencies import get_current_user_optional, get_current_user_required
 from app.models.user import User
 from app.services import (
@@ -28,8 +32,15 @@ from app.services import (
     JobParsingError,
     ResumeKeywordExtractionError,
     JobKeywordExtractionError,
+    ImprovementQueueFullError,
+    DocumentConversionTimeoutError,
+    get_improvement_queue,
+)
+from app.schemas.pydantic import (
+    ResumeImprovementRequest,
+    ResumeScoreRequest,
+    ResumeBatchScoreRequest,
 )
-from app.schemas.pydantic import ResumeImprovementRequest
 
 resume_router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -44,10 +55,17 @@ async def upload_resume(
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db_session),
     current_user: User = Depends(get_current_user_optional),
+    defer: bool = Query(
+        False,
+        description="Return once converted and stored; extract the structured resume in the background",
+    ),
 ):
     """
     Accepts a PDF or DOCX file (max 2MB), converts it to HTML/Markdown, and stores it in the database.
 
+    With `defer`, structured extraction runs as a background task; follow it
+    on `/resumes/{resume_id}/status` (or `/status/stream`).
+
     Raises:
         HTTPException: If the file type is not supported, file is empty, or file exceeds 2MB limit.
     """
@@ -108,13 +126,21 @@ async def upload_resume(
             filename=file.filename,
             content_type="md",
             user_id=user_id,
+            defer_extraction=defer,
         )
+        processing = await resume_service.get_processing_status(resume_id)
     except ResumeValidationError as e:
         logger.warning(f"Resume validation failed: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=str(e),
         )
+    except DocumentConversionTimeoutError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e),
+        )
     except Exception as e:
         logger.error(
             f"Error processing file: {str(e)} - traceback: {traceback.format_exc()}"
@@ -128,9 +154,92 @@ async def upload_resume(
         "message": f"File {file.filename} successfully processed as MD and stored in the DB",
         "request_id": request_id,
         "resume_id": resume_id,
+        "processing_status": processing["status"],
     }
 
 
+@resume_router.get(
+    "/{resume_id}/status",
+    summary="Ingestion status of an uploaded resume",
+)
+async def get_resume_status(
+    request: Request,
+    resume_id: str,
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Returns `pending`, `processing`, `ready` or `failed` (with the error)
+    for the structured extraction of an uploaded resume.
+
+    Raises:
+        HTTPException: If the resume is not found.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        processing = await ResumeService(db).get_processing_status(resume_id)
+    except ResumeNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    return JSONResponse(
+        content={"request_id": request_id, "data": processing},
+        headers=headers,
+    )
+
+
+@resume_router.get(
+    "/{resume_id}/status/stream",
+    summary="Follow the ingestion status of an uploaded resume as Server-Sent Events",
+)
+async def stream_resume_status(
+    request: Request,
+    resume_id: str,
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Sends the current status, then an event on every change, and closes
+    once the resume is `ready` or `failed`. Extraction may run in another
+    worker process, so the status is polled from the database.
+
+    Raises:
+        HTTPException: If the resume is not found.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        processing = await ResumeService(db).get_processing_status(resume_id)
+    except ResumeNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+
+    async def event_stream():
+        current = processing
+        yield f"data: {json.dumps(current)}\n\n"
+        while current["status"] not in ("ready", "failed"):
+            await asyncio.sleep(settings.TASK_POLL_INTERVAL_SECONDS)
+            if await request.is_disconnected():
+                return
+            async with AsyncSessionLocal() as session:
+                latest = await ResumeService(session).get_processing_status(resume_id)
+            if latest != current:
+                current = latest
+                yield f"data: {json.dumps(current)}\n\n"
+
+    return StreamingResponse(
+        content=event_stream(),
+        media_type="text/event-stream",
+        headers=headers,
+    )
+
+
 @resume_router.post(
     "/improve",
     summary="Score and improve a resume against a job description",
@@ -142,16 +251,35 @@ async def score_and_improve(
     stream: bool = Query(
         False, description="Enable streaming response using Server-Sent Events"
     ),
+    force: bool = Query(
+        False, description="Recompute even if a stored result exists for the same contents"
+    ),
+    defer: bool = Query(
+        False,
+        description="Queue the run as a durable task and return its task id (requires sign-in)",
+    ),
+    current_user: User = Depends(get_current_user_optional),
 ):
     """
     Scores and improves a resume against a job description.
 
+    With `defer`, the run is queued on the durable task queue and the
+    response carries its `task_id`; poll `/api/v1/tasks/{task_id}` for the
+    result.
+
     Raises:
         HTTPException: If the resume or job is not found.
     """
     request_id = getattr(request.state, "request_id", str(uuid4()))
     headers = {"X-Request-ID": request_id}
 
+    if defer and current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Sign in to queue a deferred improvement.",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     request_payload = payload.model_dump()
 
     try:
@@ -167,11 +295,28 @@ async def score_and_improve(
             )
         score_improvement_service = ScoreImprovementService(db=db)
 
+        if defer:
+            task_id = await score_improvement_service.enqueue_run(
+                resume_id=resume_id,
+                job_id=job_id,
+                force=force,
+                user_id=str(current_user.id),
+            )
+            return JSONResponse(
+                status_code=status.HTTP_202_ACCEPTED,
+                content={
+                    "request_id": request_id,
+                    "data": {"task_id": task_id, "status": "queued"},
+                },
+                headers=headers,
+            )
+
         if stream:
             return StreamingResponse(
                 content=score_improvement_service.run_and_stream(
                     resume_id=resume_id,
                     job_id=job_id,
+                    force=force,
                 ),
                 media_type="text/event-stream",
                 headers=headers,
@@ -180,6 +325,7 @@ async def score_and_improve(
             improvements = await score_improvement_service.run(
                 resume_id=resume_id,
                 job_id=job_id,
+                force=force,
             )
             return JSONResponse(
                 content={
@@ -232,6 +378,301 @@ async def score_and_improve(
         )
 
 
+@resume_router.post(
+    "/improve/runs",
+    summary="Queue a score-and-improve run and return its run id",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def queue_improvement_run(
+    request: Request,
+    payload: ResumeImprovementRequest,
+    force: bool = Query(
+        False, description="Recompute even if a stored result exists for the same contents"
+    ),
+):
+    """
+    Queues the same work as `/improve` for a background worker and returns
+    immediately. Poll `/improve/runs/{run_id}` or attach to
+    `/improve/runs/{run_id}/events` for progress.
+
+    Raises:
+        HTTPException: If the queue is full.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        run = get_improvement_queue().submit(
+            resume_id=str(payload.resume_id),
+            job_id=str(payload.job_id),
+            force=force,
+        )
+    except ImprovementQueueFullError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "request_id": request_id,
+            "data": {"run_id": run.run_id, "status": run.status},
+        },
+        headers=headers,
+    )
+
+
+@resume_router.get(
+    "/improve/runs/{run_id}",
+    summary="Get the status (and result, once finished) of a queued improvement run",
+)
+async def get_improvement_run(request: Request, run_id: str):
+    """
+    Returns the run's status, event count and, once completed, its result.
+
+    Raises:
+        HTTPException: If the run is unknown or has expired.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    run = get_improvement_queue().get(run_id)
+    if run is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Improvement run with ID {run_id} not found.",
+        )
+    return JSONResponse(
+        content={"request_id": request_id, "data": run.summary()},
+        headers=headers,
+    )
+
+
+@resume_router.get(
+    "/improve/runs/{run_id}/events",
+    summary="Attach to a queued improvement run as a Server-Sent Event stream",
+)
+async def stream_improvement_run(
+    request: Request,
+    run_id: str,
+    after: int = Query(
+        0, ge=0, description="Replay only events after this event id (defaults to Last-Event-ID)"
+    ),
+):
+    """
+    Replays the run's recorded events and then streams new ones until it
+    finishes. Each event has an `id:` so a client can reconnect with
+    `Last-Event-ID` (or `after`) without receiving duplicates. On such a
+    reconnect, rewrite text streamed so far arrives whole as `improving.text`
+    (replacing what the client had) instead of as the original deltas.
+
+    Raises:
+        HTTPException: If the run is unknown or has expired.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    queue = get_improvement_queue()
+    run = queue.get(run_id)
+    if run is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Improvement run with ID {run_id} not found.",
+        )
+    last_event_id = request.headers.get("last-event-id", "")
+    if not after and last_event_id.isdigit():
+        after = int(last_event_id)
+
+    async def event_stream():
+        async for index, payload in queue.events(run, after=after):
+            yield f"id: {index}\ndata: {json.dumps(payload)}\n\n"
+
+    return StreamingResponse(
+        content=event_stream(),
+        media_type="text/event-stream",
+        headers=headers,
+    )
+
+
+@resume_router.post(
+    "/score",
+    summary="Score a resume against a job description without rewriting it",
+)
+async def score_resume(
+    request: Request,
+    payload: ResumeScoreRequest,
+    db: AsyncSession = Depends(get_db_session),
+    baseline: Literal["embedding", "lexical"] = Query(
+        "embedding",
+        description="Score with the configured embeddings, or with offline lexical vectors (no provider call)",
+    ),
+):
+    """
+    Returns the baseline cosine score, keyword statistics and ATS
+    recommendations for a resume/job pair. No LLM calls are made.
+
+    Raises:
+        HTTPException: If the resume or job is not found.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        score_improvement_service = ScoreImprovementService(db=db)
+        score = await score_improvement_service.score(
+            resume_id=str(payload.resume_id),
+            job_id=str(payload.job_id),
+            baseline=baseline,
+        )
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": score,
+            },
+            headers=headers,
+        )
+    except (ResumeNotFoundError, JobNotFoundError) as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except (ResumeParsingError, JobParsingError) as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+    except (ResumeKeywordExtractionError, JobKeywordExtractionError) as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+
+
+@resume_router.post(
+    "/score/batch",
+    summary="Score a resume against many job descriptions, ranked",
+)
+async def score_resume_batch(
+    request: Request,
+    payload: ResumeBatchScoreRequest,
+    db: AsyncSession = Depends(get_db_session),
+    baseline: Literal["embedding", "lexical"] = Query(
+        "embedding",
+        description="Score with the configured embeddings, or with offline lexical vectors (no provider call)",
+    ),
+):
+    """
+    Scores one resume against up to 200 jobs without LLM calls and returns the
+    jobs ranked by score with their skill overlap. Jobs that cannot be scored
+    are listed under `skipped`.
+
+    Raises:
+        HTTPException: If the resume is not found.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        score_improvement_service = ScoreImprovementService(db=db)
+        scores = await score_improvement_service.score_many(
+            resume_id=str(payload.resume_id),
+            job_ids=[str(job_id) for job_id in payload.job_ids],
+            baseline=baseline,
+        )
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": scores,
+            },
+            headers=headers,
+        )
+    except ResumeNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except ResumeParsingError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        )
+    except ResumeKeywordExtractionError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+
+
+@resume_router.get(
+    "/matches",
+    summary="Get the jobs that best match a resume",
+)
+async def get_resume_matches(
+    request: Request,
+    resume_id: str = Query(..., description="Resume ID to find matching jobs for"),
+    k: int = Query(10, ge=1, le=100, description="Number of matches to return"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Returns the top-k jobs for a resume by embedding similarity, served from
+    the persistent vector store.
+
+    Raises:
+        HTTPException: If the resume is not found.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        resume_service = ResumeService(db)
+        matches = await resume_service.get_matching_jobs(resume_id=resume_id, k=k)
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": matches,
+            },
+            headers=headers,
+        )
+    except ResumeNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+
+
 @resume_router.get(
     "",
     summary="Get resume data from both resume and processed_resume models",
@@ -1,9 +1,12 @@
 import logging
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status
+from fastapi.responses import JSONResponse
 
 from app.core import get_db_session
+from app.core.auth_dependencies import get_current_user_optional
+from app.models.user import User
 from app.services import (
     LearningScheduleService,
     ResumeNotFoundError,
@@ -33,6 +36,11 @@ async def generate_learning_schedule(
     request: Request,
     schedule_request: LearningScheduleRequest,
     db: AsyncSession = Depends(get_db_session),
+    defer: bool = Query(
+        False,
+        description="Queue generation as a durable task and return its task id (requires sign-in)",
+    ),
+    current_user: User = Depends(get_current_user_optional),
 ) -> LearningScheduleModel:
     """
     Generate a personalized learning schedule for a job seeker.
@@ -41,16 +49,40 @@ async def generate_learning_schedule(
         request: FastAPI request object
         schedule_request: Learning schedule request containing resume_id, job_id, and preferences
         db: Database session
+        defer: Queue generation instead; poll /api/v1/tasks/{task_id} for the schedule
+        current_user: Signed-in user who owns a deferred task
 
     Returns:
         LearningScheduleModel: Complete learning plan with schedule, activities, and recommendations
+        (with `defer`, a 202 response carrying the task id instead)
 
     Raises:
+        HTTPException 401: If `defer` is set without signing in
         HTTPException 404: If processed resume or job not found
         HTTPException 500: If schedule generation fails
     """
     request_id = getattr(request.state, "request_id", str(uuid4()))
 
+    if defer:
+        if current_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Sign in to queue a deferred learning schedule.",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        task_id = await LearningScheduleService(db).enqueue_learning_schedule(
+            schedule_request, user_id=str(current_user.id)
+        )
+        logger.info(f"[{request_id}] Queued learning schedule generation as task {task_id}")
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "request_id": request_id,
+                "data": {"task_id": task_id, "status": "queued"},
+            },
+            headers={"X-Request-ID": request_id},
+        )
+
     try:
         logger.info(
             f"[{request_id}] Generating learning schedule for resume_id={schedule_request.resumeId}, "
@@ -0,0 +1,53 @@
+from uuid import uuid4
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+
+from app.core.auth_dependencies import get_current_user_required
+from app.models.user import User
+from app.services import get_task_queue
+
+
+tasks_router = APIRouter(prefix="/tasks", tags=["tasks"])
+
+
+@tasks_router.get("/backlog", summary="Durable task queue backlog (admin view)")
+async def get_task_backlog(
+    request: Request,
+    current_user: User = Depends(get_current_user_required),
+):
+    """
+    Returns task counts per type and status, the age of the oldest due task
+    and tasks whose lease has expired. Requires sign-in. Failed tasks carry
+    other users' task IDs and errors, so they are only listed by
+    `python -m app.cli task-backlog`.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    backlog = await get_task_queue().backlog(recent_failures=0)
+    return JSONResponse(
+        content={"request_id": request_id, "data": backlog},
+        headers={"X-Request-ID": request_id},
+    )
+
+
+@tasks_router.get("/{task_id}", summary="Status and result of a queued task")
+async def get_task(
+    request: Request,
+    task_id: str,
+    current_user: User = Depends(get_current_user_required),
+):
+    """
+    Returns the task's status, attempts, last error and, once it has
+    succeeded, its result. Only the user who queued the task can see it.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    task = await get_task_queue().get(task_id, owner_id=str(current_user.id))
+    if task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with ID {task_id} not found.",
+        )
+    return JSONResponse(
+        content={"request_id": request_id, "data": task},
+        headers={"X-Request-ID": request_id},
+    )
@@ -8,6 +8,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from .api import v1_router, RequestIDMiddleware
+from .agent import client_registry
 from .core import (
     settings,
     async_engine,
@@ -17,13 +18,44 @@ from .core import (
     unhandled_exception_handler,
 )
 from .models import Base
+from .core.database import AsyncSessionLocal, add_missing_columns
+from .services import (
+    ScoreImprovementService,
+    TaskWorker,
+    get_document_converter,
+    get_improvement_queue,
+    get_task_queue,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
+    if settings.EMBEDDING_LEXICAL_IDF_FROM_DB:
+        async with AsyncSessionLocal() as session:
+            await ScoreImprovementService(session).fit_lexical_idf()
+    if settings.EMBEDDING_PROVIDER == "onnx":
+        from .agent.providers.onnx import warm_onnx_encoder
+
+        await warm_onnx_encoder()
+    await get_document_converter().start()
+    await get_improvement_queue().start()
+    task_worker = None
+    if settings.TASK_WORKER_ENABLED:
+        task_worker = TaskWorker(
+            get_task_queue(),
+            concurrency=settings.TASK_WORKER_CONCURRENCY,
+            poll_interval=settings.TASK_POLL_INTERVAL_SECONDS,
+        )
+        await task_worker.start()
     yield
+    if task_worker is not None:
+        await task_worker.stop()
+    await get_improvement_queue().stop()
+    await get_document_converter().stop()
+    await client_registry.aclose()
     await async_engine.dispose()
 
 
@@ -0,0 +1,81 @@
+"""
+Maintenance commands.
+
+Usage (from apps/backend):
+    python -m app.cli rebuild-vector-store   # re-embed every job and resume
+    python -m app.cli update-vector-store    # embed only new or changed rows
+    python -m app.cli task-worker            # run a durable task queue worker
+    python -m app.cli task-backlog           # print the task queue backlog
+"""
+import json
+import asyncio
+import logging
+import argparse
+
+from app.core import settings, setup_logging
+from app.core.database import AsyncSessionLocal, init_models
+from app.models import Base
+from app.services import TaskWorker, get_task_queue
+from app.services.embedding_store import get_embedding_store
+
+logger = logging.getLogger(__name__)
+
+
+async def _vector_store(rebuild: bool) -> None:
+    store = get_embedding_store()
+    if store is None:
+        raise SystemExit("VECTOR_STORE_PATH is not set; the vector store is disabled.")
+    async with AsyncSessionLocal() as db:
+        if rebuild:
+            counts = await store.rebuild(db)
+        else:
+            counts = {
+                "jobs": await store.index_jobs(db),
+                "resumes": await store.index_resumes(db),
+            }
+    await store.train_ann()
+    logger.info(
+        f"Vector store updated: {counts['jobs']} jobs, {counts['resumes']} resumes embedded "
+        f"({len(store.jobs)} jobs, {len(store.resumes)} resumes stored)"
+    )
+
+
+async def _task_worker(concurrency: int) -> None:
+    await init_models(Base)
+    worker = TaskWorker(
+        get_task_queue(),
+        concurrency=concurrency,
+        poll_interval=settings.TASK_POLL_INTERVAL_SECONDS,
+    )
+    try:
+        await worker.run_forever()
+    finally:
+        await worker.stop()
+
+
+async def _task_backlog() -> None:
+    await init_models(Base)
+    print(json.dumps(await get_task_queue().backlog(), indent=2))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Resume Matcher maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild-vector-store", help="Re-embed every job and resume from the database")
+    commands.add_parser("update-vector-store", help="Embed jobs and resumes missing from the vector store")
+    worker = commands.add_parser("task-worker", help="Claim and run tasks from the durable task queue")
+    worker.add_argument("--concurrency", type=int, default=settings.TASK_WORKER_CONCURRENCY)
+    commands.add_parser("task-backlog", help="Print task counts, oldest due task and recent failures")
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.command == "task-worker":
+        asyncio.run(_task_worker(args.concurrency))
+    elif args.command == "task-backlog":
+        asyncio.run(_task_backlog())
+    else:
+        asyncio.run(_vector_store(rebuild=args.command == "rebuild-vector-store"))
+
+
+if __name__ == "__main__":
+    main()
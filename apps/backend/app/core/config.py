@@ -2,11 +2,13 @@ import os
 import sys
 import logging
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 
 
 _BACKEND_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
 _DEFAULT_DB_PATH = os.path.join(_BACKEND_ROOT, "app.db")
+_DEFAULT_CACHE_DB_PATH = os.path.join(_BACKEND_ROOT, "cache.db")
+_DEFAULT_VECTOR_STORE_PATH = os.path.join(_BACKEND_ROOT, "vector_store")
 
 
 class Settings(BaseSettings):
@@ -34,6 +36,94 @@ class Settings(BaseSettings):
     EMBEDDING_API_KEY: Optional[str] = None
     EMBEDDING_BASE_URL: Optional[str] = None
     EMBEDDING_MODEL: Optional[str] = "text-embedding-3-small"
+    # Local CPU embeddings (EMBEDDING_PROVIDER="onnx"): directory holding
+    # model.onnx and tokenizer.json, inference pool size and ORT threads.
+    EMBEDDING_ONNX_MODEL_PATH: Optional[str] = None
+    EMBEDDING_ONNX_POOL_SIZE: int = 1
+    EMBEDDING_ONNX_INTRA_OP_THREADS: int = 4
+    EMBEDDING_ONNX_BATCH_SIZE: int = 32
+    EMBEDDING_ONNX_MAX_LENGTH: int = 512
+    # Hashed character n-gram TF-IDF embeddings (provider "lexical"), used for
+    # cheap baseline scores. IDF can be fitted from stored jobs/resumes at startup.
+    EMBEDDING_LEXICAL_DIMENSIONS: int = 4096
+    EMBEDDING_LEXICAL_IDF_FROM_DB: bool = False
+    # Optional output dimensionality for models that support shortening.
+    EMBEDDING_DIMENSIONS: Optional[int] = None
+    # Content-addressed embedding cache: in-memory LRU backed by a SQLite file.
+    # Set CACHE_DB_PATH to an empty string to keep the cache in memory only.
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 2048
+    CACHE_DB_PATH: Optional[str] = _DEFAULT_CACHE_DB_PATH
+    # Persistent job/resume vectors (memory-mapped float32) for top-k matching.
+    # Set VECTOR_STORE_PATH to an empty string to disable the store.
+    VECTOR_STORE_PATH: Optional[str] = _DEFAULT_VECTOR_STORE_PATH
+    # Optional IVF approximate index over job vectors for large corpora.
+    # Trained in the background (or by the vector-store CLI commands) once a
+    # collection holds VECTOR_STORE_ANN_MIN_ROWS rows; NPROBE trades latency
+    # for recall, LISTS defaults to 4 * sqrt(rows).
+    VECTOR_STORE_ANN_ENABLED: bool = False
+    VECTOR_STORE_ANN_MIN_ROWS: int = 20000
+    VECTOR_STORE_ANN_LISTS: Optional[int] = None
+    VECTOR_STORE_ANN_NPROBE: int = 8
+    # Cross-request micro-batching of embed() calls into one embed_many request.
+    EMBEDDING_BATCH_ENABLED: bool = True
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 5.0
+    # Opt-in cache of parsed LLM responses for deterministic prompts. Only the
+    # tasks listed in LLM_CACHE_TASKS are cached; it shares CACHE_DB_PATH.
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_TASKS: List[str] = ["structured_resume", "structured_job", "resume_analysis"]
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 60 * 60
+    LLM_CACHE_MAX_ENTRIES: int = 512
+    LLM_CACHE_MAX_DISK_ENTRIES: int = 10000
+    # How a resume is scored against job keywords: "document" embeds the whole
+    # resume, "sections" embeds each section / experience item separately and
+    # combines the best chunk per section with RESUME_SECTION_WEIGHTS.
+    RESUME_SCORING_MODE: Literal["document", "sections"] = "document"
+    RESUME_SECTION_WEIGHTS: Dict[str, float] = {
+        "summary": 1.0,
+        "experience": 2.0,
+        "projects": 1.0,
+        "skills": 1.5,
+        "education": 0.5,
+        "other": 0.5,
+    }
+    # Resume improvement: with IMPROVE_PARALLEL_CANDIDATES > 1 the sequential
+    # retries are replaced by K concurrent candidates, optionally sampled at
+    # different temperatures, with an early-exit score and a wall-clock budget.
+    IMPROVE_PARALLEL_CANDIDATES: int = 1
+    IMPROVE_CANDIDATE_TEMPERATURES: List[float] = []
+    IMPROVE_EARLY_EXIT_SCORE: Optional[float] = None
+    IMPROVE_TIME_BUDGET_SECONDS: Optional[float] = None
+    # Background improvement runs (POST /resumes/improve/runs): worker count,
+    # how many runs may wait, and how long finished runs stay pollable.
+    IMPROVE_QUEUE_WORKERS: int = 2
+    IMPROVE_QUEUE_MAX_DEPTH: int = 100
+    IMPROVE_QUEUE_RETENTION_SECONDS: int = 3600
+    # Durable task queue (tasks table). The API process runs an in-app worker
+    # unless TASK_WORKER_ENABLED is off; more workers can be started with
+    # `python -m app.cli task-worker`. Failed attempts retry with exponential
+    # backoff starting at TASK_RETRY_BACKOFF_SECONDS.
+    TASK_WORKER_ENABLED: bool = True
+    TASK_WORKER_CONCURRENCY: int = 2
+    TASK_POLL_INTERVAL_SECONDS: float = 1.0
+    TASK_LEASE_SECONDS: float = 120.0
+    TASK_MAX_ATTEMPTS: int = 3
+    TASK_RETRY_BACKOFF_SECONDS: float = 5.0
+    TASK_RETRY_BACKOFF_MAX_SECONDS: float = 300.0
+    # Resume (PDF/DOCX) conversion runs in a pool of warm worker processes;
+    # 0 workers converts in a thread instead. A conversion that exceeds the
+    # timeout has its worker killed and the pool restarted.
+    DOCUMENT_CONVERSION_WORKERS: int = 2
+    DOCUMENT_CONVERSION_TIMEOUT_SECONDS: float = 60.0
+    # Connection pool limits for the shared async LLM/embedding HTTP clients.
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_HTTP_TIMEOUT: float = 120.0
+    # Seconds a dropped client (e.g. after an API key change) stays open for
+    # requests already using it before its connection pool is closed.
+    LLM_HTTP_RETIRED_CLIENT_GRACE: float = 300.0
 
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, ".env"),
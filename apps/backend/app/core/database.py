@@ -3,8 +3,8 @@ from __future__ import annotations
 from functools import lru_cache
 from typing import AsyncGenerator, Generator, Optional
 
-from sqlalchemy import event, create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy import event, create_engine, inspect
+from sqlalchemy.engine import Connection, Engine
 from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -130,6 +130,36 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+def add_missing_columns(connection: Connection, metadata=Base.metadata) -> None:
+    """
+    Minimal forward migration for existing databases: ``create_all`` skips
+    tables that already exist, so add model columns those tables lack (and
+    their indexes). Only nullable columns without server defaults are added;
+    anything else needs a real migration.
+    """
+    inspector = inspect(connection)
+    existing_tables = set(inspector.get_table_names())
+    preparer = connection.dialect.identifier_preparer
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        added = set()
+        for column in table.columns:
+            if column.name in present or not column.nullable or column.server_default is not None:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.exec_driver_sql(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+            )
+            added.add(column.name)
+        for index in table.indexes:
+            if added.intersection(column.name for column in index.columns):
+                index.create(connection, checkfirst=True)
+
+
 async def init_models(Base: Base) -> None:
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(add_missing_columns)
@@ -0,0 +1,45 @@
+from collections import defaultdict
+from typing import Dict
+
+
+class Metrics:
+    """
+    Process-wide counters and gauges.
+
+    Counters only ever go up (`incr`), gauges hold the latest value
+    (`set_gauge`). For every `<name>.hits` / `<name>.misses` counter pair the
+    snapshot also reports a derived `<name>.hit_rate`.
+    """
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        self._gauges[name] = value
+
+    def get(self, name: str) -> float:
+        if name in self._gauges:
+            return self._gauges[name]
+        return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        counters = dict(self._counters)
+        rates: Dict[str, float] = {}
+        for name, hits in counters.items():
+            if not name.endswith(".hits"):
+                continue
+            prefix = name[: -len(".hits")]
+            total = hits + counters.get(f"{prefix}.misses", 0)
+            rates[f"{prefix}.hit_rate"] = hits / total if total else 0.0
+        return {"counters": counters, "gauges": dict(self._gauges), "rates": rates}
+
+    def reset(self) -> None:
+        self._counters.clear()
+        self._gauges.clear()
+
+
+metrics = Metrics()
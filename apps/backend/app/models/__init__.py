@@ -3,6 +3,8 @@ from .resume import ProcessedResume, Resume
 from .user import User
 from .job import ProcessedJob, Job
 from .association import job_resume_association
+from .improvement_run import ImprovementRun
+from .task import Task
 
 __all__ = [
     "Base",
@@ -12,4 +14,6 @@ __all__ = [
     "User",
     "Job",
     "job_resume_association",
+    "ImprovementRun",
+    "Task",
 ]
@@ -0,0 +1,38 @@
+from sqlalchemy.types import JSON
+from sqlalchemy import Column, String, Integer, DateTime, UniqueConstraint, text
+
+from .base import Base
+
+
+class ImprovementRun(Base):
+    """
+    Stored result of a score/improve run, keyed by what it was computed from:
+    the resume and job contents, the prompt version and the models used.
+    """
+
+    __tablename__ = "improvement_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    resume_content_hash = Column(String(64), nullable=False)
+    job_content_hash = Column(String(64), nullable=False)
+    prompt_version = Column(String(64), nullable=False)
+    model = Column(String, nullable=False)
+    resume_id = Column(String, nullable=True, index=True)
+    job_id = Column(String, nullable=True, index=True)
+    result = Column(JSON, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("datetime('now', '+7 hours')"),
+        nullable=False,
+        index=True,
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "resume_content_hash",
+            "job_content_hash",
+            "prompt_version",
+            "model",
+            name="uq_improvement_runs_key",
+        ),
+    )
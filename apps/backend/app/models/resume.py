@@ -44,6 +44,14 @@ class Resume(Base):
     user_id = Column(UUID(), ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     content = Column(Text, nullable=False)
     content_type = Column(String, nullable=False)
+    # sha256 of the uploaded file and of the whitespace-normalised markdown,
+    # used to recognise re-uploads of the same resume.
+    file_sha256 = Column(String(64), nullable=True, index=True)
+    content_sha256 = Column(String(64), nullable=True, index=True)
+    # Structured extraction state: pending, processing, ready or failed.
+    # NULL for rows stored before it was tracked.
+    processing_status = Column(String, nullable=True)
+    processing_error = Column(Text, nullable=True)
     created_at = Column(
         DateTime(timezone=True),
         server_default=text("datetime('now', '+7 hours')"),
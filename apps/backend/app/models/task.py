@@ -0,0 +1,39 @@
+from sqlalchemy.types import JSON
+from sqlalchemy import Column, String, Text, Integer, DateTime, Index, text
+
+from .base import Base
+
+
+class Task(Base):
+    """
+    A unit of background work in the durable task queue.
+
+    A worker claims a task by taking its lease (`lease_owner`,
+    `lease_expires_at`); if the worker dies the lease runs out and the task
+    becomes claimable again. Failed attempts go back to `queued` with a
+    backoff `run_after` until `max_attempts` is reached. `run_after` and the
+    lease times are naive UTC set by the queue, not by the database.
+    """
+
+    __tablename__ = "tasks"
+
+    task_id = Column(String, primary_key=True, index=True)
+    task_type = Column(String, nullable=False, index=True)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False)
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("datetime('now', '+7 hours')"),
+        nullable=False,
+        index=True,
+    )
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_tasks_status_run_after", "status", "run_after"),)
@@ -4,6 +4,7 @@ from .resume_preview import ResumePreviewerModel
 from .resume_analysis import ResumeAnalysisModel
 from .structured_resume import StructuredResumeModel
 from .resume_improvement import ResumeImprovementRequest
+from .resume_score import ResumeScoreRequest, ResumeBatchScoreRequest
 from .config import LLMApiKeyResponse, LLMApiKeyUpdate
 from .learning_schedule import (
     LearningScheduleModel,
@@ -17,6 +18,8 @@ __all__ = [
     "StructuredResumeModel",
     "StructuredJobModel",
     "ResumeImprovementRequest",
+    "ResumeScoreRequest",
+    "ResumeBatchScoreRequest",
     "ResumeAnalysisModel",
     "LLMApiKeyResponse",
     "LLMApiKeyUpdate",
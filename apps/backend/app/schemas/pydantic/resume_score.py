@@ -0,0 +1,15 @@
+from uuid import UUID
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class ResumeScoreRequest(BaseModel):
+    job_id: UUID = Field(..., description="DB UUID reference to the job")
+    resume_id: UUID = Field(..., description="DB UUID reference to the resume")
+
+
+class ResumeBatchScoreRequest(BaseModel):
+    resume_id: UUID = Field(..., description="DB UUID reference to the resume")
+    job_ids: List[UUID] = Field(
+        ..., min_length=1, max_length=200, description="DB UUID references to the jobs"
+    )
@@ -11,7 +11,13 @@ from .exceptions import (
     ResumeKeywordExtractionError,
     JobKeywordExtractionError,
     LearningScheduleGenerationError,
+    ImprovementQueueFullError,
+    DocumentConversionTimeoutError,
 )
+from .improvement_queue import ImprovementQueue, get_improvement_queue
+from .document_converter import DocumentConverterPool, get_document_converter
+from .task_queue import TaskQueue, TaskWorker, enqueue_task, get_task_queue
+from . import task_handlers  # noqa: F401  (registers the task handlers)
 
 __all__ = [
     "JobService",
@@ -26,4 +32,14 @@ __all__ = [
     "ScoreImprovementService",
     "LearningScheduleService",
     "LearningScheduleGenerationError",
+    "ImprovementQueue",
+    "ImprovementQueueFullError",
+    "get_improvement_queue",
+    "TaskQueue",
+    "TaskWorker",
+    "enqueue_task",
+    "get_task_queue",
+    "DocumentConversionTimeoutError",
+    "DocumentConverterPool",
+    "get_document_converter",
 ]
@@ -0,0 +1,158 @@
+import os
+import logging
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_ASSIGN_CHUNK = 8192
+
+
+class IVFIndex:
+    """
+    Inverted-file (IVF) approximate nearest-neighbour index in NumPy.
+
+    Rows are L2-normalised vectors (cosine = dot product). Spherical k-means
+    splits them into `n_lists` clusters; a query scores the centroids, then
+    scans only the rows of its `nprobe` closest lists. Raising `nprobe`
+    trades latency for recall (`nprobe == n_lists` is exact search).
+
+    The index stores centroids and one list id per row, so it lives beside
+    the vectors it indexes and can be updated by assigning new rows to their
+    nearest centroid.
+    """
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray, trained_rows: int) -> None:
+        self.centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self.assignments = np.asarray(assignments, dtype=np.int32)
+        self.trained_rows = trained_rows
+        self._order: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), _ASSIGN_CHUNK):
+            chunk = np.asarray(vectors[start : start + _ASSIGN_CHUNK], dtype=np.float32)
+            labels[start : start + len(chunk)] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return labels
+
+    @classmethod
+    def train(
+        cls,
+        matrix: np.ndarray,
+        n_lists: Optional[int] = None,
+        iterations: int = 10,
+        sample_size: Optional[int] = None,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        """
+        Runs spherical k-means on a sample of `matrix` and assigns every row.
+        Defaults: `n_lists = 4 * sqrt(rows)`, sample of 64 rows per list.
+        """
+        rows = len(matrix)
+        n_lists = max(1, min(n_lists or int(4 * np.sqrt(rows)), rows))
+        sample_size = min(rows, sample_size or 64 * n_lists)
+        rng = np.random.default_rng(seed)
+
+        sample_rows = np.sort(rng.choice(rows, size=sample_size, replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(labels, minlength=n_lists)
+            order = np.argsort(labels, kind="stable")
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            empty = counts == 0
+            sums = np.zeros_like(centroids)
+            sums[~empty] = np.add.reduceat(sample[order], starts[~empty], axis=0)
+            if empty.any():
+                # Re-seed empty lists with random sample rows.
+                sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = sums / np.where(norms > 0, norms, 1.0)
+
+        index = cls(centroids, np.empty(0, dtype=np.int32), trained_rows=rows)
+        index.assignments = index._assign(matrix)
+        logger.info(f"Trained IVF index: {rows} rows, {n_lists} lists")
+        return index
+
+    def add(self, rows: np.ndarray, vectors: np.ndarray) -> None:
+        """
+        Assigns (new or overwritten) `rows` to their nearest list.
+        New rows must extend the index contiguously.
+        """
+        if not len(rows):
+            return
+        labels = self._assign(vectors)
+        size = max(len(self.assignments), int(rows.max()) + 1)
+        if size > len(self.assignments):
+            grown = np.full(size, -1, dtype=np.int32)
+            grown[: len(self.assignments)] = self.assignments
+            self.assignments = grown
+        self.assignments[rows] = labels
+        self._order = self._offsets = None
+
+    def _lists(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._order is None:
+            self._order = np.argsort(self.assignments, kind="stable").astype(np.intp)
+            counts = np.bincount(self.assignments, minlength=self.n_lists)
+            self._offsets = np.concatenate(([0], np.cumsum(counts)))
+        return self._order, self._offsets
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        query: np.ndarray,
+        k: int,
+        nprobe: int,
+        allowed: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (rows, scores) of the approximate top-k for a normalised query.
+        `allowed` is an optional boolean mask over rows.
+        """
+        nprobe = max(1, min(nprobe, self.n_lists))
+        order, offsets = self._lists()
+        centroid_scores = self.centroids @ query
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        candidates = np.sort(
+            np.concatenate([order[offsets[p] : offsets[p + 1]] for p in probes])
+        )
+        if allowed is not None:
+            candidates = candidates[allowed[candidates]]
+        if not len(candidates):
+            return candidates, np.empty(0, dtype=np.float32)
+
+        scores = np.asarray(matrix[candidates], dtype=np.float32) @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return candidates[top], scores[top]
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            centroids=self.centroids,
+            assignments=self.assignments,
+            trained_rows=np.int64(self.trained_rows),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["IVFIndex"]:
+        if not os.path.isfile(path):
+            return None
+        try:
+            with np.load(path) as data:
+                return cls(data["centroids"], data["assignments"], int(data["trained_rows"]))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable IVF index {path}: {e}")
+            return None
@@ -0,0 +1,261 @@
+import io
+import time
+import asyncio
+import logging
+import zipfile
+import importlib.util
+import multiprocessing
+
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.core import settings
+from app.core.metrics import metrics
+from .exceptions import DocumentConversionTimeoutError
+
+logger = logging.getLogger(__name__)
+
+PDF_MIME_TYPE = "application/pdf"
+DOCX_MIME_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+_EXTENSIONS = {PDF_MIME_TYPE: ".pdf", DOCX_MIME_TYPE: ".docx"}
+# Upload format -> the module MarkItDown's converter for it needs.
+_FORMAT_DEPENDENCIES = {"pdf": "pdfminer", "docx": "mammoth"}
+
+# Set once per worker process by `_init_worker`, so conversions reuse a warm
+# MarkItDown (and its converters) instead of building one per upload.
+_worker_markitdown = None
+
+
+def _init_worker() -> None:
+    global _worker_markitdown
+    from markitdown import MarkItDown
+
+    _worker_markitdown = MarkItDown(enable_plugins=False)
+
+
+@lru_cache(maxsize=1)
+def probe_document_support() -> Dict[str, bool]:
+    """
+    Checks once per process which upload formats MarkItDown can convert,
+    i.e. whether each converter's optional dependency is installed.
+    """
+    support = {
+        fmt: importlib.util.find_spec(module) is not None
+        for fmt, module in _FORMAT_DEPENDENCIES.items()
+    }
+    missing = [fmt.upper() for fmt, available in support.items() if not available]
+    if missing:
+        logger.warning(
+            f"Missing dependencies for {', '.join(missing)} processing. "
+            f"Such uploads will fail to convert. Install with: pip install 'markitdown[all]'"
+        )
+    return support
+
+
+def _ping() -> bool:
+    return _worker_markitdown is not None
+
+
+def _is_docx(data: bytes) -> bool:
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            return "word/document.xml" in archive.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+
+def detect_document_type(
+    data: bytes, declared_mime_type: Optional[str] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Returns (mime type, extension) for an uploaded document. The magic bytes
+    win over the declared MIME type, which browsers often get wrong; the
+    declared type is used when the bytes are not a PDF or DOCX.
+    """
+    if data.startswith(b"%PDF-"):
+        mime_type = PDF_MIME_TYPE
+    elif data.startswith(b"PK\x03\x04") and _is_docx(data):
+        mime_type = DOCX_MIME_TYPE
+    else:
+        mime_type = declared_mime_type
+    return mime_type, _EXTENSIONS.get(mime_type)
+
+
+def _run_markitdown(convert: Callable[[Any], Any]) -> str:
+    if _worker_markitdown is None:
+        _init_worker()
+    try:
+        return convert(_worker_markitdown).text_content
+    except Exception as e:
+        # Re-raise as a plain error: converter exceptions may not pickle back
+        # to the parent, and callers match on the original class name.
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+
+def _convert_bytes(
+    data: bytes, mime_type: Optional[str], extension: Optional[str], filename: Optional[str]
+) -> str:
+    from markitdown import StreamInfo
+
+    stream_info = StreamInfo(mimetype=mime_type, extension=extension, filename=filename)
+    return _run_markitdown(
+        lambda md: md.convert_stream(io.BytesIO(data), stream_info=stream_info)
+    )
+
+
+class DocumentConverterPool:
+    """
+    Runs MarkItDown conversions off the event loop.
+
+    With `workers > 0` conversions run in a process pool whose workers each
+    hold a warm MarkItDown; a conversion that exceeds `timeout_seconds` has
+    its pool torn down (the stuck process is killed) and replaced. With
+    `workers == 0` conversions run in a thread, where the timeout only stops
+    the wait. Queue depth and conversion times are reported in metrics under
+    `document_conversion.*`.
+    """
+
+    def __init__(self, workers: int, timeout_seconds: float) -> None:
+        self.workers = max(0, workers)
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._generation = 0
+        self._in_flight = 0
+        self.ready = False
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        self._generation += 1
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            # Forking a process that runs an event loop and database threads
+            # is unsafe; spawned workers start clean.
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    async def start(self) -> None:
+        """
+        Probes format support and builds the MarkItDown instances up front:
+        one per pool worker, or one in this process when `workers == 0`.
+        """
+        if self.ready:
+            return
+        started = time.perf_counter()
+        probe_document_support()
+        if self.workers == 0:
+            await asyncio.to_thread(_init_worker)
+        else:
+            self._executor = self._new_executor()
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(
+                *(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers))
+            )
+        self.ready = True
+        logger.info(
+            f"Document conversion warmed: {self.workers or 'in-process'} workers in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "formats": probe_document_support(),
+        }
+
+    def _kill(self, executor: ProcessPoolExecutor) -> None:
+        # ProcessPoolExecutor cannot cancel a running call; terminate its
+        # processes so a runaway conversion does not hold a worker forever.
+        processes = list(getattr(executor, "_processes", {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    async def stop(self) -> None:
+        self.ready = False
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _restart(self, generation: int) -> None:
+        # Several conversions may notice the same broken pool; restart once.
+        if self._executor is not None and generation == self._generation:
+            self._kill(self._executor)
+            self._executor = self._new_executor()
+            metrics.incr("document_conversion.pool_restarts")
+
+    def _track(self, delta: int) -> None:
+        self._in_flight += delta
+        metrics.set_gauge("document_conversion.in_flight", self._in_flight)
+        metrics.set_gauge(
+            "document_conversion.queue_depth", max(0, self._in_flight - max(self.workers, 1))
+        )
+
+    async def convert_bytes(
+        self,
+        data: bytes,
+        mime_type: Optional[str] = None,
+        filename: Optional[str] = None,
+    ) -> str:
+        """
+        Converts an in-memory document to markdown through MarkItDown's
+        stream converters, without writing it to disk. The type comes from
+        the magic bytes, falling back to `mime_type`. Raises
+        `DocumentConversionTimeoutError` if it takes longer than the timeout.
+        """
+        mime_type, extension = detect_document_type(data, mime_type)
+        return await self._run(_convert_bytes, data, mime_type, extension, filename)
+
+    async def _run(self, fn: Callable[..., str], *args: Any) -> str:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        self._track(+1)
+        try:
+            for attempt in range(2):
+                if self.workers == 0:
+                    future = asyncio.to_thread(fn, *args)
+                else:
+                    if self._executor is None:
+                        self._executor = self._new_executor()
+                    generation = self._generation
+                    future = loop.run_in_executor(self._executor, fn, *args)
+                try:
+                    text = await asyncio.wait_for(future, timeout=self.timeout_seconds)
+                    break
+                except asyncio.TimeoutError:
+                    metrics.incr("document_conversion.timeouts")
+                    if self.workers:
+                        self._restart(generation)
+                    raise DocumentConversionTimeoutError(timeout_seconds=self.timeout_seconds)
+                except BrokenProcessPool:
+                    # Another conversion's timeout (or a crash) killed the
+                    # pool this one was queued on; retry once on a fresh pool.
+                    self._restart(generation)
+                    if attempt:
+                        raise
+        except DocumentConversionTimeoutError:
+            raise
+        except Exception:
+            metrics.incr("document_conversion.errors")
+            raise
+        finally:
+            self._track(-1)
+
+        elapsed = time.perf_counter() - started
+        metrics.incr("document_conversion.count")
+        metrics.incr("document_conversion.seconds", elapsed)
+        metrics.set_gauge("document_conversion.last_ms", round(elapsed * 1000, 1))
+        return text
+
+
+@lru_cache(maxsize=1)
+def get_document_converter() -> DocumentConverterPool:
+    """Create (or return) the process-wide document converter pool."""
+    return DocumentConverterPool(
+        workers=settings.DOCUMENT_CONVERSION_WORKERS,
+        timeout_seconds=settings.DOCUMENT_CONVERSION_TIMEOUT_SECONDS,
+    )
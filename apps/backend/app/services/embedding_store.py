@@ -0,0 +1,522 @@
+import os
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import settings
+from app.agent import EmbeddingManager
+from app.models import Resume, ProcessedJob
+from .ann_index import IVFIndex
+from .score_improvement_service import ScoreImprovementService
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@contextmanager
+def _file_lock(path: str, shared: bool = False) -> Iterator[None]:
+    """
+    Holds an inter-process lock on `path` (flock; on Windows, where msvcrt
+    has no shared locks, every lock is exclusive).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK gives up after about ten seconds; keep waiting.
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class VectorCollection:
+    """
+    A contiguous float32 matrix on disk, keyed by id and content hash.
+
+    `vectors.f32` holds the rows back to back (read through `np.memmap`) and
+    `meta.json` holds the model, dimensionality and the id / content hash of
+    every row. Rows are L2-normalised on write, so cosine similarity against
+    all rows is a single matrix-vector product. New ids are appended and
+    changed ids are overwritten in place.
+
+    Several processes (uvicorn workers, the vector-store CLI) may share a
+    directory: writes hold an exclusive lock on its `.lock` file and reloads
+    a shared one, and every read or write first reloads the collection if
+    `meta.json` or `ivf.npz` was replaced since this process last saw them.
+
+    With `ann=True` an IVF index (`ivf.npz`) is kept up to date on every
+    upsert. Training is not done by `upsert`: once the collection holds
+    `ann_min_rows` rows, or has doubled since the last training, the index
+    is marked stale (`needs_training`) and `train_ann` rebuilds it. Until an
+    index exists, and for searches restricted to fewer than `ann_min_rows`
+    ids, search stays exact.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ann: bool = False,
+        ann_min_rows: int = 20000,
+        ann_lists: Optional[int] = None,
+        ann_nprobe: int = 8,
+    ) -> None:
+        self.directory = directory
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._ann_path = os.path.join(directory, "ivf.npz")
+        self._lock_path = os.path.join(directory, ".lock")
+        self.ann = ann
+        self.ann_min_rows = ann_min_rows
+        self.ann_lists = ann_lists
+        self.ann_nprobe = ann_nprobe
+        self._ann: Optional[IVFIndex] = None
+        self._ann_stale = False
+        self._lock = threading.Lock()
+        # What the files on disk looked like when last loaded or written.
+        self._stamp: Optional[Tuple] = None
+        self.model: Optional[str] = None
+        self.dimensions: Optional[int] = None
+        self.ids: List[str] = []
+        self.hashes: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _disk_stamp(self) -> Tuple:
+        # Both files are replaced with os.replace, so a new inode means a
+        # new version even within the filesystem's mtime resolution.
+        stamps = []
+        for path in (self._meta_path, self._ann_path):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stamps.append(None)
+            else:
+                stamps.append((stat.st_ino, stat.st_mtime_ns, stat.st_size))
+        return tuple(stamps)
+
+    def _reload_if_changed(self, shared_lock: bool = False) -> None:
+        # Call with `_lock` held. Writers already hold the file lock; readers
+        # pass `shared_lock` so they never see a half-written append.
+        if self._disk_stamp() == self._stamp:
+            return
+        if shared_lock and os.path.isdir(self.directory):
+            with _file_lock(self._lock_path, shared=True):
+                self._load()
+        else:
+            self._load()
+
+    def refresh(self) -> None:
+        """Picks up rows written by other processes since the last read."""
+        with self._lock:
+            self._reload_if_changed(shared_lock=True)
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        with self._lock, _file_lock(self._lock_path):
+            self._reload_if_changed()
+            yield
+            self._stamp = self._disk_stamp()
+
+    def _load(self) -> None:
+        # Rebind rather than clear the row lists, so snapshots handed out
+        # earlier stay consistent.
+        self._stamp = self._disk_stamp()
+        self._matrix, self._ann, self._ann_stale = None, None, False
+        self.model, self.dimensions = None, None
+        self.ids, self.hashes, self._rows = [], [], {}
+        if not os.path.isfile(self._meta_path):
+            return
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            expected = len(meta["ids"]) * (meta["dimensions"] or 0) * 4
+            if os.path.getsize(self._vectors_path) != expected:
+                raise ValueError("vector file size does not match metadata")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Vector collection {self.directory} is unreadable, starting empty: {e}")
+            return
+        self.model = meta["model"]
+        self.dimensions = meta["dimensions"]
+        self.ids = list(meta["ids"])
+        self.hashes = list(meta["hashes"])
+        self._rows = {item_id: row for row, item_id in enumerate(self.ids)}
+
+        if self.ann:
+            index = IVFIndex.load(self._ann_path)
+            if index is not None and len(index.assignments) <= len(self.ids):
+                missing = np.arange(len(index.assignments), len(self.ids))
+                index.add(missing, self.matrix[missing])
+                self._ann = index
+            self._ann_stale = self._needs_retrain()
+
+    def _save_meta(self) -> None:
+        meta = {
+            "model": self.model,
+            "dimensions": self.dimensions,
+            "ids": self.ids,
+            "hashes": self.hashes,
+        }
+        tmp_path = f"{self._meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def _open(self, mode: str = "r") -> np.ndarray:
+        if not self.ids:
+            return np.empty((0, self.dimensions or 0), dtype=np.float32)
+        return np.memmap(
+            self._vectors_path,
+            dtype=np.float32,
+            mode=mode,
+            shape=(len(self.ids), self.dimensions),
+        )
+
+    @property
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None:
+            self._matrix = self._open()
+        return self._matrix
+
+    def hash_of(self, item_id: str) -> Optional[str]:
+        row = self._rows.get(item_id)
+        return self.hashes[row] if row is not None else None
+
+    def _snapshot(self) -> Tuple[List[str], Dict[str, int], np.ndarray, Optional[IVFIndex]]:
+        # Upserts run in a worker thread; read a consistent view of the rows.
+        # Rows are only ever appended or overwritten in place, so the view
+        # stays valid after the lock is released.
+        with self._lock:
+            self._reload_if_changed(shared_lock=True)
+            return self.ids, self._rows, self.matrix, self._ann
+
+    def get(self, item_id: str) -> Optional[np.ndarray]:
+        _, rows, matrix, _ = self._snapshot()
+        row = rows.get(item_id)
+        return np.array(matrix[row]) if row is not None and row < len(matrix) else None
+
+    def reset(self, model: Optional[str] = None) -> None:
+        """Drops every row, e.g. before a rebuild or after a model change."""
+        with self._writing():
+            self._matrix = None
+            self._ann = None
+            self._ann_stale = False
+            for path in (self._vectors_path, self._meta_path, self._ann_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.model, self.dimensions = model, None
+            self.ids, self.hashes, self._rows = [], [], {}
+
+    def upsert(
+        self,
+        ids: Sequence[str],
+        hashes: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+        model: str,
+    ) -> None:
+        if not ids:
+            return
+        block = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        block /= np.where(norms > 0, norms, 1.0)
+
+        with self._writing():
+            if self.model != model or self.dimensions not in (None, block.shape[1]):
+                if self.ids:
+                    logger.warning(
+                        f"Vector collection {self.directory} was built with "
+                        f"{self.model}/{self.dimensions}; resetting for {model}/{block.shape[1]}"
+                    )
+                self._matrix = None
+                self._ann = None
+                self._ann_stale = False
+                self.ids, self.hashes, self._rows = [], [], {}
+                for path in (self._vectors_path, self._ann_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+            self.model, self.dimensions = model, block.shape[1]
+            os.makedirs(self.directory, exist_ok=True)
+            self._matrix = None
+
+            existing = [(i, self._rows[item_id]) for i, item_id in enumerate(ids) if item_id in self._rows]
+            if existing:
+                writable = self._open(mode="r+")
+                for i, row in existing:
+                    writable[row] = block[i]
+                    self.hashes[row] = hashes[i]
+                writable.flush()
+                del writable
+
+            appended = [i for i, item_id in enumerate(ids) if item_id not in self._rows]
+            if appended:
+                with open(self._vectors_path, "ab") as f:
+                    f.write(block[appended].tobytes())
+                for i in appended:
+                    self._rows[ids[i]] = len(self.ids)
+                    self.ids.append(ids[i])
+                    self.hashes.append(hashes[i])
+            self._save_meta()
+            self._update_ann(ids, block)
+
+    def _needs_retrain(self) -> bool:
+        if not self.ann or len(self.ids) < self.ann_min_rows:
+            return False
+        return self._ann is None or len(self.ids) > 2 * self._ann.trained_rows
+
+    @property
+    def needs_training(self) -> bool:
+        return self._ann_stale
+
+    def _update_ann(self, ids: Sequence[str], block: np.ndarray) -> None:
+        # Cheap: assign the written rows to the existing lists. Training is
+        # left to `train_ann` so writers never pay for k-means.
+        if self._ann is not None:
+            # Copy on write: searches may be reading the published index.
+            index = IVFIndex(
+                self._ann.centroids, self._ann.assignments.copy(), self._ann.trained_rows
+            )
+            index.add(np.array([self._rows[i] for i in ids], dtype=np.intp), block)
+            index.save(self._ann_path)
+            self._ann = index
+        if self._needs_retrain():
+            self._ann_stale = True
+
+    def train_ann(self) -> bool:
+        """
+        (Re)trains the IVF index if it is stale. Blocking; run it in a thread
+        or from the CLI. Upserts can continue meanwhile: rows appended while
+        training are added to the new index before it is swapped in, by this
+        or any other process.
+        """
+        with self._lock:
+            self._reload_if_changed(shared_lock=True)
+            if not self._needs_retrain():
+                self._ann_stale = False
+                return False
+            ids, model, matrix = self.ids, self.model, self._open()
+        index = IVFIndex.train(matrix, n_lists=self.ann_lists)
+        trained = len(matrix)
+        del matrix
+        with self._writing():
+            if self.model != model or self.ids[:trained] != ids[:trained]:
+                # The rows were reset or rebuilt while training.
+                return False
+            if not self._needs_retrain():
+                # Another process installed a fresh index meanwhile.
+                self._ann_stale = False
+                return False
+            missing = np.arange(trained, len(self.ids))
+            index.add(missing, self.matrix[missing])
+            self._ann = index
+            self._ann_stale = False
+            self._ann.save(self._ann_path)
+        return True
+
+    def search(
+        self,
+        query: Sequence[float],
+        k: int = 10,
+        allowed_ids: Optional[Iterable[str]] = None,
+        nprobe: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Top-k by cosine similarity, optionally limited to `allowed_ids`.
+        Exact unless the IVF index applies; `nprobe` overrides `ann_nprobe`.
+        """
+        ids, row_of, matrix, ann = self._snapshot()
+        if not len(matrix) or k <= 0:
+            return []
+        vector = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return []
+        vector = vector / norm
+
+        rows: Optional[np.ndarray] = None
+        if allowed_ids is not None:
+            rows = np.fromiter(
+                (row_of[i] for i in allowed_ids if row_of.get(i, len(matrix)) < len(matrix)),
+                dtype=np.intp,
+            )
+            if not len(rows):
+                return []
+
+        if ann is not None and (rows is None or len(rows) >= self.ann_min_rows):
+            allowed = None
+            if rows is not None:
+                allowed = np.zeros(len(matrix), dtype=bool)
+                allowed[rows] = True
+            found, scores = ann.search(
+                matrix, vector, k, nprobe or self.ann_nprobe, allowed=allowed
+            )
+            return [(ids[row], float(score)) for row, score in zip(found, scores)]
+
+        if rows is None:
+            rows = np.arange(len(matrix))
+            candidates = matrix @ vector
+        else:
+            candidates = np.asarray(matrix[np.sort(rows)], dtype=np.float32) @ vector
+            rows = np.sort(rows)
+
+        k = min(k, len(rows))
+        top = np.argpartition(-candidates, k - 1)[:k]
+        top = top[np.argsort(-candidates[top])]
+        return [(ids[rows[i]], float(candidates[i])) for i in top]
+
+
+class EmbeddingStore:
+    """
+    Persistent job and resume embeddings for "best matches" queries.
+
+    Jobs are embedded from their extracted keyword string and resumes from
+    their content, exactly as `ScoreImprovementService` scores them, so search
+    scores equal the baseline score and share the embedding cache.
+    """
+
+    def __init__(self, path: str, embedding_manager: Optional[EmbeddingManager] = None) -> None:
+        self.embedding_manager = embedding_manager or EmbeddingManager()
+        self.model = self.embedding_manager.cache_model
+        self.jobs = VectorCollection(
+            os.path.join(path, "jobs"),
+            ann=settings.VECTOR_STORE_ANN_ENABLED,
+            ann_min_rows=settings.VECTOR_STORE_ANN_MIN_ROWS,
+            ann_lists=settings.VECTOR_STORE_ANN_LISTS,
+            ann_nprobe=settings.VECTOR_STORE_ANN_NPROBE,
+        )
+        self.resumes = VectorCollection(os.path.join(path, "resumes"))
+        self._training: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def job_text(extracted_keywords: Optional[str]) -> str:
+        try:
+            raw = json.loads(extracted_keywords or "{}").get("extracted_keywords", [])
+        except (json.JSONDecodeError, AttributeError):
+            raw = []
+        return ", ".join(ScoreImprovementService._normalize_keyword_list(raw))
+
+    async def _index(self, collection: VectorCollection, texts: Dict[str, str]) -> int:
+        texts = {item_id: text for item_id, text in texts.items() if text}
+        hashes = {item_id: content_hash(text) for item_id, text in texts.items()}
+        await asyncio.to_thread(collection.refresh)
+        stale = [
+            item_id for item_id in texts
+            if collection.model != self.model or collection.hash_of(item_id) != hashes[item_id]
+        ]
+        if not stale:
+            return 0
+        vectors = await self.embedding_manager.embed_many([texts[i] for i in stale])
+        await asyncio.to_thread(
+            collection.upsert, stale, [hashes[i] for i in stale], vectors, model=self.model
+        )
+        if collection.needs_training:
+            self._schedule_training(collection)
+        return len(stale)
+
+    def _schedule_training(self, collection: VectorCollection) -> None:
+        """Trains `collection`'s IVF index in a background thread, once at a time."""
+        running = self._training.get(collection.directory)
+        if running is not None and not running.done():
+            return
+        task = asyncio.create_task(asyncio.to_thread(collection.train_ann))
+        task.add_done_callback(self._log_training_failure)
+        self._training[collection.directory] = task
+
+    @staticmethod
+    def _log_training_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"IVF index training failed: {task.exception()}")
+
+    async def train_ann(self) -> None:
+        """Waits for background training, then trains any index still stale."""
+        await asyncio.gather(*self._training.values(), return_exceptions=True)
+        for collection in (self.jobs, self.resumes):
+            if collection.needs_training:
+                await asyncio.to_thread(collection.train_ann)
+
+    async def index_jobs(self, db: AsyncSession, job_ids: Optional[List[str]] = None) -> int:
+        """Embeds new or changed jobs. Returns the number of rows written."""
+        query = select(ProcessedJob.job_id, ProcessedJob.extracted_keywords)
+        if job_ids is not None:
+            query = query.where(ProcessedJob.job_id.in_(job_ids))
+        rows = (await db.execute(query)).all()
+        return await self._index(
+            self.jobs, {job_id: self.job_text(keywords) for job_id, keywords in rows}
+        )
+
+    async def index_resumes(
+        self, db: AsyncSession, resume_ids: Optional[List[str]] = None
+    ) -> int:
+        """Embeds new or changed resumes. Returns the number of rows written."""
+        query = select(Resume.resume_id, Resume.content)
+        if resume_ids is not None:
+            query = query.where(Resume.resume_id.in_(resume_ids))
+        rows = (await db.execute(query)).all()
+        return await self._index(self.resumes, dict(rows))
+
+    async def rebuild(self, db: AsyncSession) -> Dict[str, int]:
+        """Rebuilds both collections from the database."""
+        await asyncio.to_thread(self.jobs.reset, self.model)
+        await asyncio.to_thread(self.resumes.reset, self.model)
+        return {
+            "jobs": await self.index_jobs(db),
+            "resumes": await self.index_resumes(db),
+        }
+
+    async def top_jobs_for_resume(
+        self,
+        db: AsyncSession,
+        resume_id: str,
+        k: int = 10,
+        job_ids: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Exact top-k jobs for a resume, indexing the resume on the fly if needed.
+        """
+        await self.index_resumes(db, [resume_id])
+        vector = self.resumes.get(resume_id)
+        if vector is None:
+            return []
+        return self.jobs.search(vector, k=k, allowed_ids=job_ids)
+
+
+@lru_cache(maxsize=1)
+def get_embedding_store() -> Optional[EmbeddingStore]:
+    """Create (or return) the process-wide store; None when VECTOR_STORE_PATH is unset."""
+    if not settings.VECTOR_STORE_PATH:
+        return None
+    return EmbeddingStore(settings.VECTOR_STORE_PATH)
@@ -142,3 +142,31 @@ class LearningScheduleGenerationError(Exception):
         if not message:
             message = "Failed to generate learning schedule."
         super().__init__(message)
+
+
+class ImprovementQueueFullError(Exception):
+    """
+    Exception raised when the improvement queue has no room for another run.
+    """
+
+    def __init__(self, max_depth: Optional[int] = None, message: Optional[str] = None):
+        if max_depth and not message:
+            message = f"Improvement queue is full (limit of {max_depth} waiting runs). Please retry shortly."
+        elif not message:
+            message = "Improvement queue is full. Please retry shortly."
+        super().__init__(message)
+        self.max_depth = max_depth
+
+
+class DocumentConversionTimeoutError(Exception):
+    """
+    Exception raised when converting an uploaded document takes too long.
+    """
+
+    def __init__(self, timeout_seconds: Optional[float] = None, message: Optional[str] = None):
+        if timeout_seconds and not message:
+            message = f"Document conversion did not finish within {timeout_seconds:g} seconds."
+        elif not message:
+            message = "Document conversion timed out."
+        super().__init__(message)
+        self.timeout_seconds = timeout_seconds
@@ -0,0 +1,267 @@
+import time
+import uuid
+import asyncio
+import logging
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from .exceptions import ImprovementQueueFullError
+from .score_improvement_service import ScoreImprovementService
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {"completed", "failed"}
+DELTA_STATUS = "improving.delta"
+
+
+@dataclass
+class ImprovementRunState:
+    """
+    Progress of one queued improvement: its status, the stage and terminal
+    events emitted so far as `(event id, payload)`, the rewrite text
+    streamed so far per attempt and, once finished, the result or error.
+
+    Streamed deltas are folded into `texts` rather than kept one by one, so
+    a run's memory grows with its rewrite, not with the number of tokens.
+    """
+
+    run_id: str
+    resume_id: str
+    job_id: str
+    force: bool = False
+    status: str = "queued"
+    seq: int = 0
+    events: List[Tuple[int, Dict[str, Any]]] = field(default_factory=list)
+    texts: Dict[int, str] = field(default_factory=dict)
+    # Event id of the latest delta folded into each attempt's text.
+    text_seq: Dict[int, int] = field(default_factory=dict)
+    last_status: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    def publish(self, payload: Dict[str, Any]) -> None:
+        self.seq += 1
+        self.last_status = payload["status"]
+        if payload["status"] == DELTA_STATUS:
+            attempt = payload["attempt"]
+            self.texts[attempt] = self.texts.get(attempt, "") + payload["delta"]
+            self.text_seq[attempt] = self.seq
+        else:
+            self.events.append((self.seq, payload))
+        # Wake every waiting subscriber, then re-arm for the next event.
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "resume_id": self.resume_id,
+            "job_id": self.job_id,
+            "status": self.status,
+            "events": self.seq,
+            "last_event": self.last_status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ImprovementQueue:
+    """
+    Bounded in-process queue of score/improve runs.
+
+    `submit` returns immediately with a run id; `workers` background tasks
+    execute runs through `ScoreImprovementService.run_events`, each with its
+    own database session, and record every progress event on the run. At most
+    `max_depth` runs may wait at once. Finished runs are kept for
+    `retention_seconds` so clients can poll or re-attach.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        max_depth: int,
+        retention_seconds: int,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+        self.retention_seconds = retention_seconds
+        self._session_factory = session_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._runs: Dict[str, ImprovementRunState] = {}
+        self._active = 0
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_depth)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"improvement-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(
+            f"Improvement queue started: {self.workers} workers, max depth {self.max_depth}"
+        )
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            run_id for run_id, run in self._runs.items()
+            if run.finished_at is not None and run.finished_at < cutoff
+        ]
+        for run_id in expired:
+            del self._runs[run_id]
+
+    def submit(self, resume_id: str, job_id: str, force: bool = False) -> ImprovementRunState:
+        """
+        Enqueues a run. Raises `ImprovementQueueFullError` when `max_depth`
+        runs are already waiting.
+        """
+        if self._queue is None:
+            raise RuntimeError("Improvement queue is not started")
+        self._prune()
+        run = ImprovementRunState(
+            run_id=str(uuid.uuid4()), resume_id=resume_id, job_id=job_id, force=force
+        )
+        try:
+            self._queue.put_nowait(run)
+        except asyncio.QueueFull:
+            metrics.incr("improvement_queue.rejected")
+            raise ImprovementQueueFullError(max_depth=self.max_depth)
+        self._runs[run.run_id] = run
+        run.publish({"status": "queued", "position": self.depth})
+        metrics.incr("improvement_queue.submitted")
+        metrics.set_gauge("improvement_queue.depth", self.depth)
+        return run
+
+    def get(self, run_id: str) -> Optional[ImprovementRunState]:
+        return self._runs.get(run_id)
+
+    async def events(
+        self, run: ImprovementRunState, after: int = 0
+    ) -> AsyncGenerator[tuple, None]:
+        """
+        Yields `(event id, event)` for everything after event id `after`:
+        first what is already recorded, then new events as they arrive,
+        until the run ends.
+
+        Rewrite text not yet sent goes out as one `improving.delta` per
+        attempt, so concatenating an attempt's deltas gives its text. A
+        subscriber resuming mid-stream (`after` > 0) cannot know how much
+        of an attempt's text it has, so it gets that text whole as
+        `improving.text`, then deltas from there.
+        """
+        sent = after
+        offsets: Dict[int, int] = {}
+        while True:
+            changed = run.changed
+            # Build the batch without awaiting so it is a consistent view.
+            upto = run.seq
+            batch = [(seq, payload) for seq, payload in run.events if sent < seq <= upto]
+            for attempt, text in run.texts.items():
+                seq = run.text_seq[attempt]
+                if attempt not in offsets:
+                    if seq <= after:
+                        # Streamed in full before the subscriber reconnected.
+                        offsets[attempt] = len(text)
+                        continue
+                    if after:
+                        batch.append(
+                            (seq, {"status": "improving.text", "attempt": attempt, "text": text})
+                        )
+                        offsets[attempt] = len(text)
+                        continue
+                    offsets[attempt] = 0
+                if len(text) > offsets[attempt]:
+                    batch.append(
+                        (
+                            seq,
+                            {
+                                "status": DELTA_STATUS,
+                                "attempt": attempt,
+                                "delta": text[offsets[attempt] :],
+                            },
+                        )
+                    )
+                    offsets[attempt] = len(text)
+            sent = upto
+            for seq, payload in sorted(batch, key=lambda item: item[0]):
+                yield seq, payload
+            if run.status in TERMINAL_STATUSES and sent == run.seq:
+                return
+            await changed.wait()
+
+    async def _worker(self) -> None:
+        while True:
+            run = await self._queue.get()
+            metrics.set_gauge("improvement_queue.depth", self.depth)
+            try:
+                await self._execute(run)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, run: ImprovementRunState) -> None:
+        run.status, run.started_at = "running", time.time()
+        self._active += 1
+        metrics.set_gauge("improvement_queue.active", self._active)
+        try:
+            async with self._session_factory() as db:
+                service = ScoreImprovementService(db=db)
+                async for payload in service.run_events(
+                    run.resume_id, run.job_id, force=run.force
+                ):
+                    if payload["status"] == "completed":
+                        run.result = payload["result"]
+                        run.status = "completed"
+                    run.publish(payload)
+            if run.status != "completed":
+                raise RuntimeError("Improvement run ended without a result.")
+            metrics.incr("improvement_queue.completed")
+        except asyncio.CancelledError:
+            run.status, run.error = "failed", "Improvement run was cancelled."
+            run.publish({"status": "error", "message": run.error})
+            raise
+        except Exception as e:
+            logger.error(f"Improvement run {run.run_id} failed: {e}")
+            run.status, run.error = "failed", str(e)
+            run.publish({"status": "error", "message": run.error})
+            metrics.incr("improvement_queue.failed")
+        finally:
+            run.finished_at = time.time()
+            self._active -= 1
+            metrics.set_gauge("improvement_queue.active", self._active)
+
+
+@lru_cache(maxsize=1)
+def get_improvement_queue() -> ImprovementQueue:
+    """Create (or return) the process-wide improvement queue."""
+    return ImprovementQueue(
+        workers=settings.IMPROVE_QUEUE_WORKERS,
+        max_depth=settings.IMPROVE_QUEUE_MAX_DEPTH,
+        retention_seconds=settings.IMPROVE_QUEUE_RETENTION_SECONDS,
+    )
@@ -5,6 +5,7 @@ import logging
 from typing import List, Dict, Any, Optional
 from pydantic import ValidationError
 from sqlalchemy import select, insert, and_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.agent import AgentManager
@@ -14,6 +15,7 @@ from app.models import Job, Resume, ProcessedJob, ProcessedResume
 from app.models.association import job_resume_association
 from app.schemas.pydantic import StructuredJobModel
 from .exceptions import JobNotFoundError
+from .task_queue import JOB_EXTRACTION_TASK, enqueue_task
 
 logger = logging.getLogger(__name__)
 
@@ -23,13 +25,17 @@ class JobService:
         self.db = db
         self.json_agent_manager = AgentManager()
 
-    async def create_and_store_job(self, job_data: dict, user_id: Optional[str] = None) -> List[str]:
+    async def create_and_store_job(
+        self, job_data: dict, user_id: Optional[str] = None, defer_extraction: bool = False
+    ) -> List[str]:
         """
         Stores job data in the database and returns a list of job IDs.
         
         Args:
             job_data: Dictionary containing job descriptions and resume_id
             user_id: Optional user ID to link jobs to a user (None for guest uploads)
+            defer_extraction: Queue the LLM extraction as a `job.extract` task
+                instead of running it inline
         """
         resume_id = str(job_data.get("resume_id"))
 
@@ -58,17 +64,37 @@ class JobService:
             # Create association between job and resume
             await self._create_job_resume_association(job_id, resume_id)
 
-            # Process the job and create processed_job entry
-            await self._extract_and_store_structured_job(
-                job_id=job_id, 
-                job_description_text=job_description, 
-                user_id=user_id
-            )
+            if defer_extraction:
+                await enqueue_task(self.db, JOB_EXTRACTION_TASK, {"job_id": job_id, "user_id": user_id})
+            else:
+                # Process the job and create processed_job entry
+                await self._extract_and_store_structured_job(
+                    job_id=job_id, 
+                    job_description_text=job_description, 
+                    user_id=user_id
+                )
             logger.info(f"Job ID: {job_id} created and associated with resume: {resume_id}")
             job_ids.append(job_id)
 
         await self.db.commit()
+        if not defer_extraction:
+            await self._index_jobs(job_ids)
         return job_ids
+
+    async def _index_jobs(self, job_ids: List[str]) -> None:
+        """
+        Adds the new jobs to the vector store. Best-effort: matching falls
+        back to a rebuild, so a failure here must not fail the upload.
+        """
+        from .embedding_store import get_embedding_store
+
+        store = get_embedding_store()
+        if store is None:
+            return
+        try:
+            await store.index_jobs(self.db, job_ids)
+        except Exception as e:
+            logger.warning(f"Failed to index jobs {job_ids} in the vector store: {e}")
     
     async def _create_job_resume_association(self, job_id: str, resume_id: str) -> None:
         """
@@ -132,8 +158,12 @@ class JobService:
             logger.debug(f"Job-resume association already exists: job_id={job_id}, resume_id={resume_id}")
             return
         
-        # Create new association if it doesn't exist
-        await self._create_job_resume_association(job_id, resume_id)
+        # Create it, tolerating a concurrent request that got there first
+        await self.db.execute(
+            sqlite_insert(job_resume_association)
+            .values(job_id=job_id, resume_id=resume_id)
+            .on_conflict_do_nothing()
+        )
         await self.db.commit()
 
     async def _extract_and_store_structured_job(
@@ -207,7 +237,9 @@ class JobService:
             job_description_text,
         )
         logger.info(f"Structured Job Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        raw_output = await self.json_agent_manager.run(
+            prompt=prompt, task="structured_job"
+        )
 
         try:
             structured_job: StructuredJobModel = StructuredJobModel.model_validate(
@@ -215,6 +247,7 @@ class JobService:
             )
         except ValidationError as e:
             logger.info(f"Validation error: {e}")
+            self.json_agent_manager.evict(prompt, task="structured_job")
             error_details = []
             for error in e.errors():
                 field = " -> ".join(str(loc) for loc in error["loc"])
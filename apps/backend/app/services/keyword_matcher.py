@@ -0,0 +1,118 @@
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+
+def _is_word_char(ch: str) -> bool:
+    # Same definition as `\w` in Python's `re` for str patterns.
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """
+    Counts whole-word occurrences of many keywords in one pass (Aho-Corasick).
+
+    For every keyword the count equals
+    `len(re.findall(rf"(?<!\\w){re.escape(keyword)}(?!\\w)", text))`:
+    a match must not be preceded or followed by a word character, and matches
+    of the same keyword never overlap (leftmost first). Matches of different
+    keywords may overlap, e.g. "machine" inside "machine learning".
+
+    Matching is case-sensitive; callers lower-case keywords and text alike.
+    Build once per keyword list (see `get_keyword_matcher`) and reuse.
+    """
+
+    def __init__(self, keywords: Sequence[str]) -> None:
+        self.keywords: Tuple[str, ...] = tuple(keywords)
+        self._lengths: List[int] = []
+        # keyword index(es) per distinct pattern, so duplicates share one entry
+        self._pattern_keywords: List[List[int]] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+
+        patterns: Dict[str, int] = {}
+        for index, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            pattern_id = patterns.get(keyword)
+            if pattern_id is None:
+                pattern_id = patterns[keyword] = len(self._lengths)
+                self._lengths.append(len(keyword))
+                self._pattern_keywords.append([])
+                state = 0
+                for ch in keyword:
+                    next_state = self._goto[state].get(ch)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][ch] = next_state
+                        self._goto.append({})
+                        outputs.append([])
+                    state = next_state
+                outputs[state].append(pattern_id)
+            self._pattern_keywords[pattern_id].append(index)
+
+        # Failure links in BFS order; each state inherits the outputs of its
+        # failure state so a single lookup yields every pattern ending there.
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                outputs[child].extend(outputs[self._fail[child]])
+        self._outputs: List[Tuple[int, ...]] = [tuple(out) for out in outputs]
+        # Memoised DFA transitions, filled on demand while scanning.
+        self._delta: List[Dict[str, int]] = [dict(edges) for edges in self._goto]
+
+    def _step(self, state: int, ch: str) -> int:
+        origin = state
+        while state and ch not in self._goto[state]:
+            state = self._fail[state]
+        target = self._goto[state].get(ch, 0)
+        self._delta[origin][ch] = target
+        return target
+
+    def count(self, text: str) -> List[int]:
+        """
+        Returns the number of matches of each keyword in `text`, in the order
+        the keywords were given.
+        """
+        lengths, outputs, delta, step = self._lengths, self._outputs, self._delta, self._step
+        pattern_counts = [0] * len(lengths)
+        last_end = [0] * len(lengths)
+        size = len(text)
+        state = 0
+        for position, ch in enumerate(text):
+            next_state = delta[state].get(ch)
+            state = step(state, ch) if next_state is None else next_state
+            matched = outputs[state]
+            if not matched:
+                continue
+            end = position + 1
+            if end < size and _is_word_char(text[end]):
+                continue
+            for pattern_id in matched:
+                start = end - lengths[pattern_id]
+                if start < last_end[pattern_id]:
+                    continue
+                if start and _is_word_char(text[start - 1]):
+                    continue
+                pattern_counts[pattern_id] += 1
+                last_end[pattern_id] = end
+
+        counts = [0] * len(self.keywords)
+        for pattern_id, indexes in enumerate(self._pattern_keywords):
+            for index in indexes:
+                counts[index] = pattern_counts[pattern_id]
+        return counts
+
+
+@lru_cache(maxsize=128)
+def get_keyword_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    """Returns a shared matcher for the given (hashable) keyword tuple."""
+    return KeywordMatcher(keywords)
@@ -15,6 +15,7 @@ from .exceptions import (
     JobNotFoundError,
 )
 from .exceptions import LearningScheduleGenerationError
+from .task_queue import LEARNING_SCHEDULE_TASK, enqueue_task
 
 logger = logging.getLogger(__name__)
 
@@ -83,6 +84,22 @@ class LearningScheduleService:
         
         return processed_job
 
+    async def enqueue_learning_schedule(
+        self, request: LearningScheduleRequest, user_id: Optional[str] = None
+    ) -> str:
+        """
+        Queue schedule generation as a durable `learning_schedule.generate`
+        task owned by `user_id` and return its id; the schedule is stored as
+        the task result.
+        """
+        task_id = await enqueue_task(
+            self.db,
+            LEARNING_SCHEDULE_TASK,
+            {**request.model_dump(mode="json"), "user_id": user_id},
+        )
+        await self.db.commit()
+        return task_id
+
     async def generate_learning_schedule(
         self,
         request: LearningScheduleRequest
@@ -153,7 +170,9 @@ class LearningScheduleService:
             # Generate schedule using AI
             for attempt in range(self.max_retries):
                 try:
-                    raw_output = await self.agent_manager.run(prompt=formatted_prompt)
+                    raw_output = await self.agent_manager.run(
+                        prompt=formatted_prompt, task="learning_schedule"
+                    )
                     
                     # Log the raw output for debugging
                     logger.info(f"Raw AI output type: {type(raw_output)}")
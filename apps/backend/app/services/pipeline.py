@@ -0,0 +1,111 @@
+import time
+import asyncio
+import logging
+
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, Iterable, Tuple
+
+from app.core.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+StageResults = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    A named pipeline step. `fn` receives the results of every stage completed
+    so far (keyed by stage name) and may only rely on the ones listed in `after`.
+    """
+
+    name: str
+    fn: Callable[[StageResults], Awaitable[Any]]
+    after: Tuple[str, ...] = ()
+
+
+class Pipeline:
+    """
+    Runs a small dependency graph of async stages.
+
+    Every stage starts as soon as all of its dependencies have finished, so
+    independent stages run concurrently. Wall-clock durations are recorded per
+    stage in `timings` (milliseconds) and published as
+    `<name>.stage_ms.<stage>` gauges. If a stage fails, the remaining stages
+    are cancelled and the exception propagates.
+    """
+
+    def __init__(self, name: str, stages: Iterable[Stage]) -> None:
+        self.name = name
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate pipeline stage: {stage.name}")
+            self.stages[stage.name] = stage
+        self._check_graph()
+        self.results: StageResults = {}
+        self.timings: Dict[str, float] = {}
+
+    def _check_graph(self) -> None:
+        for stage in self.stages.values():
+            unknown = [dep for dep in stage.after if dep not in self.stages]
+            if unknown:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {unknown}")
+
+        resolved: set = set()
+        remaining = dict(self.stages)
+        while remaining:
+            ready = [n for n, s in remaining.items() if resolved.issuperset(s.after)]
+            if not ready:
+                raise ValueError(f"Pipeline {self.name} has a cycle among: {sorted(remaining)}")
+            for name in ready:
+                resolved.add(name)
+                del remaining[name]
+
+    async def _run_stage(self, stage: Stage) -> Any:
+        started = time.perf_counter()
+        try:
+            return await stage.fn(self.results)
+        finally:
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            self.timings[stage.name] = elapsed_ms
+            metrics.set_gauge(f"{self.name}.stage_ms.{stage.name}", elapsed_ms)
+
+    async def stream(self) -> AsyncGenerator[Tuple[str, Any], None]:
+        """
+        Executes the graph and yields `(stage_name, result)` as each stage
+        completes.
+        """
+        self.results, self.timings = {}, {}
+        waiting = dict(self.stages)
+        running: Dict[asyncio.Task, str] = {}
+
+        def schedule() -> None:
+            ready = [
+                name for name, stage in waiting.items()
+                if all(dep in self.results for dep in stage.after)
+            ]
+            for name in ready:
+                task = asyncio.create_task(self._run_stage(waiting.pop(name)))
+                running[task] = name
+
+        try:
+            schedule()
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    self.results[name] = task.result()
+                    yield name, self.results[name]
+                schedule()
+        finally:
+            for task in running:
+                task.cancel()
+
+        logger.info(f"Pipeline {self.name} stage timings (ms): {self.timings}")
+
+    async def execute(self) -> StageResults:
+        """Executes the graph and returns every stage result by name."""
+        async for _ in self.stream():
+            pass
+        return self.results
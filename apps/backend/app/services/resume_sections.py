@@ -0,0 +1,127 @@
+import re
+
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+_MD_HEADING = re.compile(r"^\s{0,3}(#{1,6})\s+(.+?)\s*#*\s*$")
+_BOLD_HEADING = re.compile(r"^\s{0,3}(?:\*\*|__)(.+?)(?:\*\*|__)\s*:?\s*$")
+
+_KIND_PATTERNS: Tuple[Tuple[str, re.Pattern], ...] = (
+    ("summary", re.compile(r"\b(summary|profile|objective|about me|overview)\b")),
+    ("experience", re.compile(r"\b(experience|employment|work history|career history)\b")),
+    ("projects", re.compile(r"\bprojects?\b")),
+    ("skills", re.compile(r"\b(skills?|technologies|tech stack|competencies|tools)\b")),
+    ("education", re.compile(r"\b(education|academic|certifications?|courses?)\b")),
+)
+# Sections whose sub-headings start a new item (one chunk per job / project).
+_ITEMISED = {"experience", "projects"}
+
+
+@dataclass(frozen=True)
+class ResumeSection:
+    kind: str
+    title: str
+    text: str
+
+
+def classify_heading(title: str) -> Optional[str]:
+    lowered = title.lower()
+    for kind, pattern in _KIND_PATTERNS:
+        if pattern.search(lowered):
+            return kind
+    return None
+
+
+def _heading(line: str) -> Optional[Tuple[int, str]]:
+    """Returns (level, title) when the line is a heading."""
+    match = _MD_HEADING.match(line)
+    if match:
+        return len(match.group(1)), match.group(2).strip()
+    match = _BOLD_HEADING.match(line)
+    if match:
+        return 7, match.group(1).strip()
+    stripped = line.strip()
+    # PDF conversions often render headings as short upper-case lines.
+    if stripped and stripped.isupper() and len(stripped.split()) <= 4 and classify_heading(stripped):
+        return 1, stripped
+    return None
+
+
+@lru_cache(maxsize=256)
+def split_resume_sections(resume_text: str) -> Tuple[ResumeSection, ...]:
+    """
+    Splits a markdown resume into scoring chunks.
+
+    Headings that name a known section (summary, experience, projects,
+    skills, education) open a section of that kind; inside experience and
+    projects, deeper headings open one chunk per item. Text before the first
+    known section heading is the `header` (name, contact details); other
+    headings are `other`. A resume without headings is returned as a single
+    `other` chunk. Results are cached by text, so each version is split once.
+    """
+    chunks: List[Tuple[str, str, List[str]]] = []
+    kind, title, level = "header", "", 0
+    lines: List[str] = []
+
+    def flush() -> None:
+        # Skip chunks that hold nothing but their heading line.
+        if "\n".join(lines[1:] if title else lines).strip():
+            chunks.append((kind, title, lines[:]))
+
+    for line in resume_text.splitlines():
+        heading = _heading(line)
+        if heading is None:
+            lines.append(line)
+            continue
+        heading_level, heading_title = heading
+        heading_kind = classify_heading(heading_title)
+        if heading_kind is None and kind in _ITEMISED and heading_level > level:
+            # An item (job, project) inside the current itemised section.
+            flush()
+            lines = [line]
+            title = heading_title
+            continue
+        if heading_kind is None and kind == "header":
+            # Unknown headings before the first section (e.g. the candidate's
+            # name) belong to the header.
+            lines.append(line)
+            continue
+        flush()
+        lines = [line]
+        kind = heading_kind or "other"
+        title, level = heading_title, heading_level
+
+    flush()
+    sections = tuple(
+        ResumeSection(kind=kind, title=title, text="\n".join(body).strip())
+        for kind, title, body in chunks
+    )
+    if not any(section.kind != "header" for section in sections):
+        return (ResumeSection(kind="other", title="", text=resume_text.strip()),)
+    return sections
+
+
+def aggregate_section_scores(
+    kinds: Sequence[str], scores: np.ndarray, weights: Mapping[str, float]
+) -> np.ndarray:
+    """
+    Weighted aggregate of chunk scores.
+
+    `scores` has one column per chunk (and optionally one row per job). Each
+    section kind scores as its best chunk; kinds are then averaged with
+    `weights`, normalised over the kinds present. Kinds without a weight
+    count as 0. Falls back to the plain chunk mean if every weight is 0.
+    """
+    scores = np.atleast_2d(scores)
+    per_kind: Dict[str, np.ndarray] = {}
+    for kind in dict.fromkeys(kinds):
+        columns = [i for i, k in enumerate(kinds) if k == kind]
+        per_kind[kind] = scores[:, columns].max(axis=1)
+
+    total_weight = sum(weights.get(kind, 0.0) for kind in per_kind)
+    if total_weight <= 0:
+        return scores.mean(axis=1)
+    return sum(weights.get(kind, 0.0) * values for kind, values in per_kind.items()) / total_weight
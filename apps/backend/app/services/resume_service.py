@@ -1,123 +1,264 @@
-import os
 import uuid
 import json
-import tempfile
+import hashlib
 import logging
 
-from markitdown import MarkItDown
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from pydantic import ValidationError
-from typing import Dict, Optional
-from sqlalchemy import select, and_
+from typing import Dict, List, Optional
+from sqlalchemy import select, and_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Resume, ProcessedResume
+from app.models import Resume, ProcessedResume, Job, ProcessedJob, job_resume_association
 from app.agent import AgentManager
+from app.core.metrics import metrics
 from app.prompt import prompt_factory
 from app.schemas.json import json_schema_factory
 from app.schemas.pydantic import StructuredResumeModel
-from .exceptions import ResumeNotFoundError, ResumeValidationError
+from .exceptions import ResumeNotFoundError, ResumeValidationError, DocumentConversionTimeoutError
+from .document_converter import get_document_converter
+from .task_queue import RESUME_EXTRACTION_TASK, enqueue_task
 
 logger = logging.getLogger(__name__)
 
+# ProcessedResume columns copied when a duplicate upload is cloned.
+_PROCESSED_RESUME_FIELDS = (
+    "personal_data",
+    "experiences",
+    "projects",
+    "skills",
+    "research_work",
+    "achievements",
+    "education",
+    "extracted_keywords",
+)
+
+
+def _normalize_markdown(text: str) -> str:
+    """Collapses whitespace and blank lines so trivial re-exports hash alike."""
+    return "\n".join(" ".join(line.split()) for line in text.splitlines() if line.strip())
+
 
 class ResumeService:
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.md = MarkItDown(enable_plugins=False)
         self.json_agent_manager = AgentManager()
-        
-        # Validate dependencies for DOCX processing
-        self._validate_docx_dependencies()
-
-    def _validate_docx_dependencies(self):
-        """Validate that required dependencies for DOCX processing are available"""
-        missing_deps = []
-        
-        try:
-            # Check if markitdown can handle docx files
-            from markitdown.converters import DocxConverter
-            # Try to instantiate the converter to check if dependencies are available
-            DocxConverter()
-        except ImportError:
-            missing_deps.append("markitdown[all]==0.1.2")
-        except Exception as e:
-            if "MissingDependencyException" in str(e) or "dependencies needed to read .docx files" in str(e):
-                missing_deps.append("markitdown[all]==0.1.2 (current installation missing DOCX extras)")
-        
-        if missing_deps:
-            logger.warning(
-                f"Missing dependencies for DOCX processing: {', '.join(missing_deps)}. "
-                f"DOCX file processing may fail. Install with: pip install {' '.join(missing_deps)}"
-            )
-
 
     async def convert_and_store_resume(
-        self, file_bytes: bytes, file_type: str, filename: str, content_type: str = "md", user_id: Optional[str] = None
+        self,
+        file_bytes: bytes,
+        file_type: str,
+        filename: str,
+        content_type: str = "md",
+        user_id: Optional[str] = None,
+        defer_extraction: bool = False,
     ):
         """
         Converts resume file (PDF/DOCX) to text using MarkItDown and stores it in the database.
 
+        Re-uploads are recognised by the sha256 of the file and, after
+        conversion, of the normalised markdown. If an already processed copy
+        exists, its `ProcessedResume` is reused without any LLM call: the
+        same user gets their existing resume_id back, another owner gets a
+        clone.
+
         Args:
             file_bytes: Raw bytes of the uploaded file
             file_type: MIME type of the file ("application/pdf" or "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
             filename: Original filename
             content_type: Output format ("md" for markdown or "html")
             user_id: Optional user ID to link the resume to a user (None for guest uploads)
+            defer_extraction: Queue the LLM extraction as a `resume.extract` task
+                instead of running it inline
 
         Returns:
             resume_id: The ID of the stored resume
         """
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=self._get_file_extension(file_type)
-        ) as temp_file:
-            temp_file.write(file_bytes)
-            temp_path = temp_file.name
+        file_sha256 = hashlib.sha256(file_bytes).hexdigest()
+        duplicate = await self._find_processed_duplicate(Resume.file_sha256, file_sha256, user_id)
+        if duplicate is not None:
+            metrics.incr("resume_dedup.file_hits")
+            return await self._reuse_resume(duplicate, user_id)
 
         try:
+            text_content = await get_document_converter().convert_bytes(
+                file_bytes, mime_type=file_type, filename=filename
+            )
+        except DocumentConversionTimeoutError:
+            raise
+        except Exception as e:
+            # Handle specific markitdown conversion errors
+            error_msg = str(e)
+            if "MissingDependencyException" in error_msg or "DocxConverter" in error_msg:
+                raise Exception(
+                    "File conversion failed: markitdown is missing DOCX support. "
+                    "Please install with: pip install 'markitdown[all]==0.1.2' or contact system administrator."
+                ) from e
+            elif "docx" in error_msg.lower():
+                raise Exception(
+                    f"DOCX file processing failed: {error_msg}. "
+                    "Please ensure the file is a valid DOCX document."
+                ) from e
+            else:
+                raise Exception(f"File conversion failed: {error_msg}") from e
+
+        content_sha256 = hashlib.sha256(_normalize_markdown(text_content).encode()).hexdigest()
+        duplicate = await self._find_processed_duplicate(
+            Resume.content_sha256, content_sha256, user_id
+        )
+        if duplicate is not None:
+            metrics.incr("resume_dedup.content_hits")
+            return await self._reuse_resume(duplicate, user_id, file_sha256=file_sha256)
+
+        metrics.incr("resume_dedup.misses")
+        resume_id = await self._store_resume_in_db(
+            text_content,
+            content_type,
+            user_id,
+            file_sha256=file_sha256,
+            content_sha256=content_sha256,
+            processing_status="pending" if defer_extraction else "processing",
+        )
+
+        if defer_extraction:
+            await enqueue_task(
+                self.db, RESUME_EXTRACTION_TASK, {"resume_id": resume_id, "user_id": user_id}
+            )
+            await self.db.commit()
+        else:
             try:
-                result = self.md.convert(temp_path)
-                text_content = result.text_content
+                await self._extract_and_store_structured_resume(
+                    resume_id=resume_id, resume_text=text_content, user_id=user_id
+                )
             except Exception as e:
-                # Handle specific markitdown conversion errors
-                error_msg = str(e)
-                if "MissingDependencyException" in error_msg or "DocxConverter" in error_msg:
-                    raise Exception(
-                        "File conversion failed: markitdown is missing DOCX support. "
-                        "Please install with: pip install 'markitdown[all]==0.1.2' or contact system administrator."
-                    ) from e
-                elif "docx" in error_msg.lower():
-                    raise Exception(
-                        f"DOCX file processing failed: {error_msg}. "
-                        "Please ensure the file is a valid DOCX document."
-                    ) from e
-                else:
-                    raise Exception(f"File conversion failed: {error_msg}") from e
-            
-            resume_id = await self._store_resume_in_db(text_content, content_type, user_id)
-
-            await self._extract_and_store_structured_resume(
-                resume_id=resume_id, resume_text=text_content, user_id=user_id
+                await self.set_processing_status(resume_id, "failed", error=str(e))
+                raise
+            await self.set_processing_status(resume_id, "ready")
+        await self._index_resume(resume_id)
+
+        return resume_id
+
+    async def set_processing_status(
+        self, resume_id: str, status: str, error: Optional[str] = None
+    ) -> None:
+        """Records the structured-extraction state of a resume."""
+        await self.db.execute(
+            update(Resume)
+            .where(Resume.resume_id == resume_id)
+            .values(processing_status=status, processing_error=error)
+        )
+        await self.db.commit()
+
+    async def get_processing_status(self, resume_id: str) -> Dict:
+        """
+        Returns the ingestion state of a resume: `pending` (queued for
+        extraction), `processing`, `ready` or `failed` (with the error).
+        Resumes stored before the state was tracked are `ready` if they have
+        a processed resume, `failed` otherwise.
+        """
+        row = (
+            await self.db.execute(
+                select(Resume.processing_status, Resume.processing_error, ProcessedResume.resume_id)
+                .outerjoin(ProcessedResume, ProcessedResume.resume_id == Resume.resume_id)
+                .where(Resume.resume_id == resume_id)
             )
+        ).first()
+        if row is None:
+            raise ResumeNotFoundError(resume_id=resume_id)
+        status, error, processed_id = row
+        if status is None:
+            status = "ready" if processed_id else "failed"
+        return {"resume_id": resume_id, "status": status, "error": error}
+
+    async def _find_processed_duplicate(
+        self, column, digest: str, user_id: Optional[str]
+    ) -> Optional[Resume]:
+        """
+        Returns a processed resume whose `column` hash equals `digest`,
+        preferring one owned by `user_id`.
+        """
+        query = (
+            select(Resume)
+            .join(ProcessedResume, ProcessedResume.resume_id == Resume.resume_id)
+            .where(column == digest)
+            .order_by(Resume.id)
+            .limit(1)
+        )
+        if user_id is not None:
+            own = await self.db.scalar(query.where(Resume.user_id == user_id))
+            if own is not None:
+                return own
+        return await self.db.scalar(query)
+
+    async def _reuse_resume(
+        self, duplicate: Resume, user_id: Optional[str], file_sha256: Optional[str] = None
+    ) -> str:
+        """
+        Returns the resume_id to use for a re-uploaded resume: the existing
+        one if `user_id` already owns it, otherwise a new resume whose
+        `ProcessedResume` is copied from the duplicate.
+        """
+        metrics.incr("resume_dedup.hits")
+        if user_id is not None and duplicate.user_id is not None and str(duplicate.user_id) == str(user_id):
+            logger.info(f"Re-upload of resume {duplicate.resume_id} by its owner; reusing it")
+            return duplicate.resume_id
 
-            return resume_id
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-
-    def _get_file_extension(self, file_type: str) -> str:
-        """Returns the appropriate file extension based on MIME type"""
-        if file_type == "application/pdf":
-            return ".pdf"
-        elif (
-            file_type
-            == "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        ):
-            return ".docx"
-        return ""
-
-    async def _store_resume_in_db(self, text_content: str, content_type: str, user_id: Optional[str] = None):
+        processed = await self.db.scalar(
+            select(ProcessedResume).where(ProcessedResume.resume_id == duplicate.resume_id)
+        )
+        resume_id = str(uuid.uuid4())
+        self.db.add(
+            Resume(
+                resume_id=resume_id,
+                user_id=user_id,
+                content=duplicate.content,
+                content_type=duplicate.content_type,
+                file_sha256=file_sha256 or duplicate.file_sha256,
+                content_sha256=duplicate.content_sha256,
+                processing_status="ready",
+            )
+        )
+        self.db.add(
+            ProcessedResume(
+                resume_id=resume_id,
+                user_id=user_id,
+                **{
+                    column: getattr(processed, column)
+                    for column in _PROCESSED_RESUME_FIELDS
+                },
+            )
+        )
+        await self.db.commit()
+        metrics.incr("resume_dedup.clones")
+        logger.info(f"Cloned processed resume {duplicate.resume_id} as {resume_id}")
+        await self._index_resume(resume_id)
+        return resume_id
+
+    async def _index_resume(self, resume_id: str) -> None:
+        """
+        Adds the new resume to the vector store. Best-effort: a failure here
+        must not fail the upload.
+        """
+        from .embedding_store import get_embedding_store
+
+        store = get_embedding_store()
+        if store is None:
+            return
+        try:
+            await store.index_resumes(self.db, [resume_id])
+        except Exception as e:
+            logger.warning(f"Failed to index resume {resume_id} in the vector store: {e}")
+
+    async def _store_resume_in_db(
+        self,
+        text_content: str,
+        content_type: str,
+        user_id: Optional[str] = None,
+        file_sha256: Optional[str] = None,
+        content_sha256: Optional[str] = None,
+        processing_status: Optional[str] = None,
+    ):
         """
         Stores the parsed resume content in the database.
         """
@@ -126,7 +267,10 @@ class ResumeService:
             resume_id=resume_id,
             user_id=user_id,
             content=text_content,
-            content_type=content_type
+            content_type=content_type,
+            file_sha256=file_sha256,
+            content_sha256=content_sha256,
+            processing_status=processing_status,
         )
 
         self.db.add(resume)
@@ -218,7 +362,9 @@ class ResumeService:
             resume_text,
         )
         logger.info(f"Structured Resume Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        raw_output = await self.json_agent_manager.run(
+            prompt=prompt, task="structured_resume"
+        )
 
         try:
             structured_resume: StructuredResumeModel = (
@@ -226,6 +372,7 @@ class ResumeService:
             )
         except ValidationError as e:
             logger.info(f"Validation error: {e}")
+            self.json_agent_manager.evict(prompt, task="structured_resume")
             error_details = []
             for error in e.errors():
                 field = " -> ".join(str(loc) for loc in error["loc"])
@@ -389,3 +536,47 @@ class ResumeService:
             result.append(resume_data)
 
         return result
+
+    async def get_matching_jobs(self, resume_id: str, k: int = 10) -> List[Dict]:
+        """
+        Returns the `k` jobs closest to the resume from the vector store.
+
+        Candidates are the jobs owned by the resume's user or, for guest
+        resumes, the jobs associated with the resume.
+        """
+        from .embedding_store import get_embedding_store
+
+        resume_result = await self.db.execute(
+            select(Resume).where(Resume.resume_id == resume_id)
+        )
+        resume = resume_result.scalars().first()
+        if not resume:
+            raise ResumeNotFoundError(resume_id=resume_id)
+
+        store = get_embedding_store()
+        if store is None:
+            return []
+
+        if resume.user_id is not None:
+            candidates_query = select(Job.job_id).where(Job.user_id == resume.user_id)
+        else:
+            candidates_query = select(job_resume_association.c.job_id).where(
+                job_resume_association.c.resume_id == resume_id
+            )
+        job_ids = list((await self.db.execute(candidates_query)).scalars().all())
+        # Picks up jobs stored before the vector store existed or while it failed.
+        await store.index_jobs(self.db, job_ids)
+
+        matches = await store.top_jobs_for_resume(self.db, resume_id, k=k, job_ids=job_ids)
+        if not matches:
+            return []
+        titles_result = await self.db.execute(
+            select(ProcessedJob.job_id, ProcessedJob.job_title).where(
+                ProcessedJob.job_id.in_([job_id for job_id, _ in matches])
+            )
+        )
+        titles = dict(titles_result.all())
+        return [
+            {"job_id": job_id, "job_title": titles.get(job_id), "score": score}
+            for job_id, score in matches
+        ]
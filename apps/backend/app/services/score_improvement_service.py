@@ -1,22 +1,32 @@
 import gc
 import json
+import hashlib
 import asyncio
 import logging
 import markdown
 import numpy as np
 import re
+import time
 
 from sqlalchemy.future import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Optional, Tuple, AsyncGenerator, List
+from functools import partial
+from typing import Callable, Dict, Iterable, Optional, Tuple, AsyncGenerator, List
 
+from app.core import settings
+from app.core.metrics import metrics
 from app.prompt import prompt_factory
 from app.schemas.json import json_schema_factory
 from app.schemas.pydantic import ResumePreviewerModel, ResumeAnalysisModel
 from app.agent import EmbeddingManager, AgentManager
-from app.models import Resume, Job, ProcessedResume, ProcessedJob
+from app.models import Resume, Job, ProcessedResume, ProcessedJob, ImprovementRun
 from .job_service import JobService
+from .task_queue import IMPROVEMENT_TASK, enqueue_task
+from .pipeline import Pipeline, Stage
+from .keyword_matcher import get_keyword_matcher
+from .resume_sections import aggregate_section_scores, split_resume_sections
 from .exceptions import (
     ResumeNotFoundError,
     JobNotFoundError,
@@ -28,6 +38,10 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Prompts and schemas whose text shapes a stored improvement result.
+_IMPROVEMENT_PROMPTS = ("resume_improvement", "structured_resume", "resume_analysis")
+_IMPROVEMENT_SCHEMAS = ("resume_preview", "resume_analysis")
+
 
 class ScoreImprovementService:
     """
@@ -37,12 +51,21 @@ class ScoreImprovementService:
     the scoring process.
     """
 
-    def __init__(self, db: AsyncSession, max_retries: int = 5):
+    def __init__(
+        self,
+        db: AsyncSession,
+        max_retries: int = 5,
+        parallel_candidates: int = settings.IMPROVE_PARALLEL_CANDIDATES,
+        scoring_mode: str = settings.RESUME_SCORING_MODE,
+    ):
         self.db = db
         self.max_retries = max_retries
+        self.parallel_candidates = parallel_candidates
+        self.scoring_mode = scoring_mode
         self.md_agent_manager = AgentManager(strategy="md")
         self.json_agent_manager = AgentManager()
         self.embedding_manager = EmbeddingManager()
+        self.lexical_embedding_manager = EmbeddingManager(model_provider="lexical")
 
     @staticmethod
     def _normalize_keyword_list(raw_keywords: List[str]) -> List[str]:
@@ -73,22 +96,19 @@ class ScoreImprovementService:
     ) -> List[Dict[str, int | str]]:
         if not keywords:
             return []
-        resume_norm = cls._prepare_text_for_matching(resume_text)
-        job_norm = cls._prepare_text_for_matching(job_text)
-        stats: List[Dict[str, int | str]] = []
-        for keyword in keywords:
-            kw_lower = keyword.lower()
-            pattern = re.compile(rf"(?<!\w){re.escape(kw_lower)}(?!\w)")
-            resume_mentions = len(pattern.findall(resume_norm))
-            job_mentions = len(pattern.findall(job_norm))
-            stats.append(
-                {
-                    "skill": keyword,
-                    "resume_mentions": resume_mentions,
-                    "job_mentions": job_mentions,
-                }
+        matcher = get_keyword_matcher(tuple(keyword.lower() for keyword in keywords))
+        resume_counts = matcher.count(cls._prepare_text_for_matching(resume_text))
+        job_counts = matcher.count(cls._prepare_text_for_matching(job_text))
+        return [
+            {
+                "skill": keyword,
+                "resume_mentions": resume_mentions,
+                "job_mentions": job_mentions,
+            }
+            for keyword, resume_mentions, job_mentions in zip(
+                keywords, resume_counts, job_counts
             )
-        return stats
+        ]
 
     @staticmethod
     def _has_summary_section(resume_text: str) -> bool:
@@ -126,9 +146,9 @@ class ScoreImprovementService:
         return "\n".join(lines)
 
     @classmethod
-    def _build_ats_recommendations(
+    def _list_ats_recommendations(
         cls, stats: List[Dict[str, int | str]], resume_text: str
-    ) -> str:
+    ) -> List[str]:
         recommendations: List[str] = []
         if not cls._has_summary_section(resume_text):
             recommendations.append(
@@ -154,6 +174,13 @@ class ScoreImprovementService:
                 "Tighten each section so that high-priority keywords appear in strong action-driven bullets supported by concrete outcomes."
             )
 
+        return recommendations
+
+    @classmethod
+    def _build_ats_recommendations(
+        cls, stats: List[Dict[str, int | str]], resume_text: str
+    ) -> str:
+        recommendations = cls._list_ats_recommendations(stats, resume_text)
         return "\n".join(f"    - {rec}" for rec in recommendations)
 
     def _validate_resume_keywords(
@@ -214,19 +241,23 @@ class ScoreImprovementService:
 
         return resume, processed_resume
 
-    async def _get_job(self, job_id: str) -> Tuple[Job | None, ProcessedJob | None]:
+    async def _get_job(
+        self, job_id: str, db: Optional[AsyncSession] = None
+    ) -> Tuple[Job | None, ProcessedJob | None]:
         """
-        Fetches the job from the database.
+        Fetches the job from the database, using `db` instead of the service
+        session when given.
         """
+        db = db or self.db
         query = select(Job).where(Job.job_id == job_id)
-        result = await self.db.execute(query)
+        result = await db.execute(query)
         job = result.scalars().first()
 
         if not job:
             raise JobNotFoundError(job_id=job_id)
 
         query = select(ProcessedJob).where(ProcessedJob.job_id == job_id)
-        result = await self.db.execute(query)
+        result = await db.execute(query)
         processed_job = result.scalars().first()
 
         if not processed_job:
@@ -250,7 +281,96 @@ class ScoreImprovementService:
         ejk = np.asarray(extracted_job_keywords_embedding).squeeze()
         re = np.asarray(resume_embedding).squeeze()
 
-        return float(np.dot(ejk, re) / (np.linalg.norm(ejk) * np.linalg.norm(re)))
+        norms = np.linalg.norm(ejk) * np.linalg.norm(re)
+        if not norms:
+            # e.g. the lexical vector of an empty keyword string
+            return 0.0
+        return float(np.dot(ejk, re) / norms)
+
+    def _resume_inputs(self, resume_text: str) -> Tuple[List[str], List[str]]:
+        """
+        Texts to embed for a resume and the section kind of each: the whole
+        document, or its section chunks in "sections" scoring mode.
+        """
+        if self.scoring_mode == "sections":
+            sections = split_resume_sections(resume_text)
+            return [section.text for section in sections], [section.kind for section in sections]
+        return [resume_text], ["document"]
+
+    def _aggregate_resume_scores(self, kinds: List[str], scores: np.ndarray) -> np.ndarray:
+        """
+        Combines per-input scores (one column per input from `_resume_inputs`)
+        into one score per row.
+        """
+        if self.scoring_mode == "sections":
+            return aggregate_section_scores(kinds, scores, settings.RESUME_SECTION_WEIGHTS)
+        return np.atleast_2d(scores)[:, 0]
+
+    async def score_resumes(
+        self,
+        resume_texts: List[str],
+        job_keywords: Optional[str] = None,
+        job_embedding: Optional[np.ndarray] = None,
+    ) -> Tuple[List[float], np.ndarray]:
+        """
+        Scores resume texts against the job keywords with one batched
+        embedding call, which also embeds `job_keywords` when no
+        `job_embedding` is given. Returns the scores and the job embedding.
+
+        In "sections" mode every section chunk is embedded on its own, so a
+        rewrite only re-embeds the chunks it changed (the rest are embedding
+        cache hits).
+        """
+        inputs: List[str] = []
+        layout: List[Tuple[int, List[str]]] = []
+        for text in resume_texts:
+            texts, kinds = self._resume_inputs(text)
+            layout.append((len(inputs), kinds))
+            inputs.extend(texts)
+        if job_embedding is None:
+            inputs.append(job_keywords)
+
+        vectors = await self.embedding_manager.embed_many(inputs)
+        if job_embedding is None:
+            job_embedding = vectors[-1]
+
+        scores: List[float] = []
+        for offset, kinds in layout:
+            chunk_scores = np.array(
+                [
+                    self.calculate_cosine_similarity(job_embedding, vector)
+                    for vector in vectors[offset : offset + len(kinds)]
+                ]
+            )
+            scores.append(float(self._aggregate_resume_scores(kinds, chunk_scores)[0]))
+        return scores, job_embedding
+
+    async def lexical_baseline_scores(self, resume_text: str, job_texts: List[str]) -> List[float]:
+        """
+        Cheap, offline baseline scores of one resume against each job text,
+        from hashed TF-IDF vectors; no provider call.
+        """
+        resume_vector, *job_vectors = await self.lexical_embedding_manager.embed_many(
+            [resume_text, *job_texts]
+        )
+        return [
+            self.calculate_cosine_similarity(job_vector, resume_vector)
+            for job_vector in job_vectors
+        ]
+
+    async def fit_lexical_idf(self) -> int:
+        """
+        Learns lexical IDF statistics from every stored job and resume.
+        Returns the number of documents used.
+        """
+        from app.agent.providers.lexical import get_lexical_provider
+
+        job_rows = await self.db.execute(select(Job.content))
+        resume_rows = await self.db.execute(select(Resume.content))
+        texts = [row[0] for row in job_rows] + [row[0] for row in resume_rows]
+        provider = get_lexical_provider()
+        provider.fit(texts)
+        return provider.fitted_documents
 
     async def improve_score_with_llm(
         self,
@@ -262,27 +382,50 @@ class ScoreImprovementService:
         extracted_job_keywords_embedding: np.ndarray,
         ats_recommendations: str,
         skill_priority_text: str,
+        on_delta: Optional[Callable[[int, str], None]] = None,
     ) -> Tuple[str, float]:
+        """
+        Asks the LLM to rewrite the resume until the score improves or the
+        retries run out. When `on_delta` is given the rewrite is streamed and
+        every text delta is reported as `on_delta(attempt, delta)`.
+
+        With `parallel_candidates` > 1 the retries are replaced by one round
+        of concurrent candidates (see `_improve_with_candidates`).
+        """
         prompt_template = prompt_factory.get("resume_improvement")
         best_resume, best_score = resume, previous_cosine_similarity_score
+        prompt = prompt_template.format(
+            raw_job_description=job,
+            extracted_job_keywords=extracted_job_keywords,
+            raw_resume=best_resume,
+            extracted_resume_keywords=extracted_resume_keywords,
+            current_cosine_similarity=best_score,
+            ats_recommendations=ats_recommendations,
+            skill_priority_text=skill_priority_text,
+        )
+
+        if self.parallel_candidates > 1:
+            return await self._improve_with_candidates(
+                prompt=prompt,
+                resume=best_resume,
+                score=best_score,
+                extracted_job_keywords_embedding=extracted_job_keywords_embedding,
+                on_delta=on_delta,
+            )
 
         for attempt in range(1, self.max_retries + 1):
             logger.info(
                 f"Attempt {attempt}/{self.max_retries} to improve resume score."
             )
-            prompt = prompt_template.format(
-                raw_job_description=job,
-                extracted_job_keywords=extracted_job_keywords,
-                raw_resume=best_resume,
-                extracted_resume_keywords=extracted_resume_keywords,
-                current_cosine_similarity=best_score,
-                ats_recommendations=ats_recommendations,
-                skill_priority_text=skill_priority_text,
+            improved = await self.md_agent_manager.run(
+                prompt,
+                task="resume_improvement",
+                on_delta=(
+                    partial(on_delta, attempt) if on_delta is not None else None
+                ),
             )
-            improved = await self.md_agent_manager.run(prompt)
-            emb = await self.embedding_manager.embed(text=improved)
-            score = self.calculate_cosine_similarity(
-                emb, extracted_job_keywords_embedding
+            (score,), _ = await self.score_resumes(
+                [improved], job_embedding=extracted_job_keywords_embedding
             )
 
             if score > best_score:
@@ -294,6 +437,88 @@ class ScoreImprovementService:
 
         return best_resume, best_score
 
+    async def _improve_with_candidates(
+        self,
+        prompt: str,
+        resume: str,
+        score: float,
+        extracted_job_keywords_embedding: np.ndarray,
+        on_delta: Optional[Callable[[int, str], None]] = None,
+    ) -> Tuple[str, float]:
+        """
+        Generates `parallel_candidates` rewrites concurrently (optionally each
+        with a different temperature), embeds the finished ones with a single
+        batched call and keeps the best-scoring one.
+
+        Stops early once a candidate reaches IMPROVE_EARLY_EXIT_SCORE and never
+        waits longer than IMPROVE_TIME_BUDGET_SECONDS; unfinished candidates
+        are cancelled. Returns the original resume if no candidate beats it.
+        """
+        temperatures = settings.IMPROVE_CANDIDATE_TEMPERATURES
+        early_exit = settings.IMPROVE_EARLY_EXIT_SCORE
+        budget = settings.IMPROVE_TIME_BUDGET_SECONDS
+
+        async def generate(candidate: int) -> str:
+            options = {}
+            if temperatures:
+                options["temperature"] = temperatures[(candidate - 1) % len(temperatures)]
+            return await self.md_agent_manager.run(
+                prompt,
+                task="resume_improvement",
+                # Candidates are meant to differ: never share or replay them.
+                use_cache=False,
+                coalesce=False,
+                on_delta=(
+                    partial(on_delta, candidate) if on_delta is not None else None
+                ),
+                **options,
+            )
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + budget if budget else None
+        return_when = (
+            asyncio.FIRST_COMPLETED if early_exit is not None else asyncio.ALL_COMPLETED
+        )
+        pending = {
+            asyncio.create_task(generate(candidate))
+            for candidate in range(1, self.parallel_candidates + 1)
+        }
+        best_resume, best_score = resume, score
+        try:
+            while pending:
+                timeout = max(0.0, deadline - loop.time()) if deadline else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=return_when
+                )
+                if not done:
+                    logger.info("Improvement time budget exhausted.")
+                    break
+
+                texts = []
+                for finished in done:
+                    if finished.exception() is not None:
+                        logger.warning(
+                            f"Improvement candidate failed: {finished.exception()}"
+                        )
+                    else:
+                        texts.append(finished.result())
+                if texts:
+                    candidate_scores, _ = await self.score_resumes(
+                        texts, job_embedding=extracted_job_keywords_embedding
+                    )
+                    for text, candidate_score in zip(texts, candidate_scores):
+                        logger.info(f"Improvement candidate scored {candidate_score}")
+                        if candidate_score > best_score:
+                            best_resume, best_score = text, candidate_score
+
+                if early_exit is not None and best_score >= early_exit:
+                    break
+        finally:
+            for unfinished in pending:
+                unfinished.cancel()
+
+        return best_resume, best_score
+
     async def get_resume_for_previewer(self, updated_resume: str) -> Dict:
         """
         Returns the updated resume in a format suitable for the dashboard.
@@ -304,7 +529,9 @@ class ScoreImprovementService:
             updated_resume,
         )
         logger.info(f"Structured Resume Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        raw_output = await self.json_agent_manager.run(
+            prompt=prompt, task="resume_preview"
+        )
 
         try:
             resume_preview: ResumePreviewerModel = ResumePreviewerModel.model_validate(
@@ -312,6 +539,7 @@ class ScoreImprovementService:
             )
         except ValidationError as e:
             logger.info(f"Validation error: {e}")
+            self.json_agent_manager.evict(prompt, task="resume_preview")
             return None
         return resume_preview.model_dump()
 
@@ -340,235 +568,520 @@ class ScoreImprovementService:
             new_score,
         )
 
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        raw_output = await self.json_agent_manager.run(
+            prompt=prompt, task="resume_analysis"
+        )
 
         try:
             analysis = ResumeAnalysisModel.model_validate(raw_output)
         except ValidationError as e:
             logger.info(f"Resume analysis validation error: {e}")
+            self.json_agent_manager.evict(prompt, task="resume_analysis")
             return None
 
         return analysis.model_dump()
 
-    async def run(self, resume_id: str, job_id: str) -> Dict:
-        """
-        Main method to run the scoring and improving process and return dict.
+    def _build_pipeline(
+        self,
+        resume_id: str,
+        job_id: str,
+        on_delta: Optional[Callable[[int, str], None]] = None,
+        stages: Optional[Iterable[str]] = None,
+    ) -> Pipeline:
         """
-        # Ensure job-resume association exists for this comparison
-        job_service = JobService(self.db)
-        await job_service.ensure_job_resume_association(job_id, resume_id)
+        Describes the score/improve flow as a graph of stages:
 
-        resume, processed_resume = await self._get_resume(resume_id)
-        job, processed_job = await self._get_job(job_id)
+            fetch_resume ─┬─ associate
+            fetch_job ────┴─ keyword_stats ─ embeddings ─ improve ─┬─ preview
+                                                                   ├─ analysis
+                                                                   └─ skill_comparison
 
-        job_keywords_raw = json.loads(processed_job.extracted_keywords).get(
-            "extracted_keywords", []
-        )
-        resume_keywords_raw = json.loads(processed_resume.extracted_keywords).get(
-            "extracted_keywords", []
-        )
+        The two fetches use separate sessions so they can run concurrently;
+        `associate` writes on the service session once `fetch_resume` is done
+        with it. `stages` restricts the graph to the named stages.
+        """
 
-        job_keywords_list = self._normalize_keyword_list(job_keywords_raw)
-        resume_keywords_list = self._normalize_keyword_list(resume_keywords_raw)
+        async def fetch_resume(_: Dict) -> Tuple[Resume, ProcessedResume]:
+            return await self._get_resume(resume_id)
 
-        extracted_job_keywords = ", ".join(job_keywords_list)
+        async def fetch_job(_: Dict) -> Tuple[Job, ProcessedJob]:
+            async with AsyncSession(bind=self.db.bind, expire_on_commit=False) as db:
+                return await self._get_job(job_id, db=db)
 
-        extracted_resume_keywords = ", ".join(resume_keywords_list)
+        async def associate(_: Dict) -> None:
+            # Ensure job-resume association exists for this comparison
+            job_service = JobService(self.db)
+            await job_service.ensure_job_resume_association(job_id, resume_id)
 
-        skill_stats_for_prompt = self._build_skill_comparison(
-            keywords=job_keywords_list,
-            resume_text=resume.content,
-            job_text=job.content,
-        )
-        ats_recommendations = self._build_ats_recommendations(
-            stats=skill_stats_for_prompt,
-            resume_text=resume.content,
-        )
-        skill_priority_text = self._build_skill_priority_text(skill_stats_for_prompt)
+        async def keyword_stats(results: Dict) -> Dict:
+            resume, processed_resume = results["fetch_resume"]
+            job, processed_job = results["fetch_job"]
 
-        resume_embedding_task = asyncio.create_task(
-            self.embedding_manager.embed(resume.content)
-        )
-        job_kw_embedding_task = asyncio.create_task(
-            self.embedding_manager.embed(extracted_job_keywords)
-        )
-        resume_embedding, extracted_job_keywords_embedding = await asyncio.gather(
-            resume_embedding_task, job_kw_embedding_task
-        )
+            job_keywords_raw = json.loads(processed_job.extracted_keywords).get(
+                "extracted_keywords", []
+            )
+            resume_keywords_raw = json.loads(processed_resume.extracted_keywords).get(
+                "extracted_keywords", []
+            )
 
-        cosine_similarity_score = self.calculate_cosine_similarity(
-            extracted_job_keywords_embedding, resume_embedding
-        )
-        updated_resume, updated_score = await self.improve_score_with_llm(
-            resume=resume.content,
-            extracted_resume_keywords=extracted_resume_keywords,
-            job=job.content,
-            extracted_job_keywords=extracted_job_keywords,
-            previous_cosine_similarity_score=cosine_similarity_score,
-            extracted_job_keywords_embedding=extracted_job_keywords_embedding,
-            ats_recommendations=ats_recommendations,
-            skill_priority_text=skill_priority_text,
-        )
+            job_keywords_list = self._normalize_keyword_list(job_keywords_raw)
+            resume_keywords_list = self._normalize_keyword_list(resume_keywords_raw)
 
-        resume_preview = await self.get_resume_for_previewer(
-            updated_resume=updated_resume
-        )
+            skill_stats_for_prompt = self._build_skill_comparison(
+                keywords=job_keywords_list,
+                resume_text=resume.content,
+                job_text=job.content,
+            )
+            return {
+                "skill_stats": skill_stats_for_prompt,
+                "job_keywords_list": job_keywords_list,
+                "extracted_job_keywords": ", ".join(job_keywords_list),
+                "extracted_resume_keywords": ", ".join(resume_keywords_list),
+                "ats_recommendations": self._build_ats_recommendations(
+                    stats=skill_stats_for_prompt,
+                    resume_text=resume.content,
+                ),
+                "skill_priority_text": self._build_skill_priority_text(
+                    skill_stats_for_prompt
+                ),
+            }
+
+        async def embeddings(results: Dict) -> Tuple[float, np.ndarray]:
+            resume, _ = results["fetch_resume"]
+            keywords = results["keyword_stats"]
+            (cosine_similarity_score,), extracted_job_keywords_embedding = (
+                await self.score_resumes(
+                    [resume.content], job_keywords=keywords["extracted_job_keywords"]
+                )
+            )
+            return cosine_similarity_score, extracted_job_keywords_embedding
+
+        async def improve(results: Dict) -> Tuple[str, float]:
+            resume, _ = results["fetch_resume"]
+            job, _ = results["fetch_job"]
+            keywords = results["keyword_stats"]
+            cosine_similarity_score, extracted_job_keywords_embedding = results[
+                "embeddings"
+            ]
+            return await self.improve_score_with_llm(
+                resume=resume.content,
+                extracted_resume_keywords=keywords["extracted_resume_keywords"],
+                job=job.content,
+                extracted_job_keywords=keywords["extracted_job_keywords"],
+                previous_cosine_similarity_score=cosine_similarity_score,
+                extracted_job_keywords_embedding=extracted_job_keywords_embedding,
+                ats_recommendations=keywords["ats_recommendations"],
+                skill_priority_text=keywords["skill_priority_text"],
+                on_delta=on_delta,
+            )
 
-        resume_analysis = await self.get_resume_analysis(
-            original_resume=resume.content,
-            improved_resume=updated_resume,
-            job_description=job.content,
-            extracted_job_keywords=extracted_job_keywords,
-            extracted_resume_keywords=extracted_resume_keywords,
-            original_score=cosine_similarity_score,
-            new_score=updated_score,
-        )
+        async def preview(results: Dict) -> Dict | None:
+            updated_resume, _ = results["improve"]
+            return await self.get_resume_for_previewer(updated_resume=updated_resume)
+
+        async def analysis(results: Dict) -> Dict | None:
+            resume, _ = results["fetch_resume"]
+            job, _ = results["fetch_job"]
+            keywords = results["keyword_stats"]
+            cosine_similarity_score, _ = results["embeddings"]
+            updated_resume, updated_score = results["improve"]
+            return await self.get_resume_analysis(
+                original_resume=resume.content,
+                improved_resume=updated_resume,
+                job_description=job.content,
+                extracted_job_keywords=keywords["extracted_job_keywords"],
+                extracted_resume_keywords=keywords["extracted_resume_keywords"],
+                original_score=cosine_similarity_score,
+                new_score=updated_score,
+            )
 
-        skill_comparison = self._build_skill_comparison(
-            keywords=job_keywords_list,
-            resume_text=updated_resume,
-            job_text=job.content,
-        )
+        async def skill_comparison(results: Dict) -> List[Dict]:
+            job, _ = results["fetch_job"]
+            updated_resume, _ = results["improve"]
+            return self._build_skill_comparison(
+                keywords=results["keyword_stats"]["job_keywords_list"],
+                resume_text=updated_resume,
+                job_text=job.content,
+            )
 
-        logger.info(f"Resume Preview: {resume_preview}")
+        graph = [
+            Stage("fetch_resume", fetch_resume),
+            Stage("fetch_job", fetch_job),
+            Stage("associate", associate, after=("fetch_resume", "fetch_job")),
+            Stage("keyword_stats", keyword_stats, after=("fetch_resume", "fetch_job")),
+            Stage("embeddings", embeddings, after=("keyword_stats",)),
+            Stage("improve", improve, after=("keyword_stats", "embeddings")),
+            Stage("preview", preview, after=("improve",)),
+            Stage("analysis", analysis, after=("improve",)),
+            Stage("skill_comparison", skill_comparison, after=("improve",)),
+        ]
+        if stages is not None:
+            selected = set(stages)
+            graph = [stage for stage in graph if stage.name in selected]
+        return Pipeline("score_pipeline", graph)
+
+    @staticmethod
+    def _build_execution(resume_id: str, job_id: str, results: Dict) -> Dict:
+        """
+        Assembles the response payload from the pipeline stage results.
+        """
+        resume, _ = results["fetch_resume"]
+        job, _ = results["fetch_job"]
+        cosine_similarity_score, _ = results["embeddings"]
+        updated_resume, updated_score = results["improve"]
+        resume_analysis = results["analysis"]
 
-        execution = {
+        return {
             "resume_id": resume_id,
             "job_id": job_id,
             "original_score": cosine_similarity_score,
             "new_score": updated_score,
             "updated_resume": markdown.markdown(text=updated_resume),
-            "resume_preview": resume_preview,
+            "resume_preview": results["preview"],
             "details": resume_analysis.get("details") if resume_analysis else "",
             "commentary": resume_analysis.get("commentary") if resume_analysis else "",
             "improvements": resume_analysis.get("improvements") if resume_analysis else [],
             "original_resume_markdown": resume.content,
             "updated_resume_markdown": updated_resume,
             "job_description": job.content,
-            "job_keywords": extracted_job_keywords,
-            "skill_comparison": skill_comparison,
+            "job_keywords": results["keyword_stats"]["extracted_job_keywords"],
+            "skill_comparison": results["skill_comparison"],
         }
 
-        gc.collect()
-
-        return execution
-
-    async def run_and_stream(self, resume_id: str, job_id: str) -> AsyncGenerator:
+    async def score(self, resume_id: str, job_id: str, baseline: str = "embedding") -> Dict:
         """
-        Main method to run the scoring and improving process and return dict.
+        Score-only fast path: the baseline cosine score, keyword statistics and
+        ATS recommendations, without any LLM call. Embeddings come from the
+        embedding cache whenever the resume and keywords were seen before.
+        With `baseline="lexical"` the score comes from the offline lexical
+        vectors instead, without any embedding provider call.
         """
-        # Ensure job-resume association exists for this comparison
-        job_service = JobService(self.db)
-        await job_service.ensure_job_resume_association(job_id, resume_id)
+        stages = ("fetch_resume", "fetch_job", "keyword_stats")
+        if baseline != "lexical":
+            stages += ("embeddings",)
+        results = await self._build_pipeline(resume_id, job_id, stages=stages).execute()
+
+        resume, _ = results["fetch_resume"]
+        keywords = results["keyword_stats"]
+        if baseline == "lexical":
+            (cosine_similarity_score,) = await self.lexical_baseline_scores(
+                resume.content, [keywords["extracted_job_keywords"]]
+            )
+        else:
+            cosine_similarity_score, _ = results["embeddings"]
+        return {
+            "resume_id": resume_id,
+            "job_id": job_id,
+            "baseline": baseline,
+            "score": cosine_similarity_score,
+            "job_keywords": keywords["extracted_job_keywords"],
+            "skill_comparison": keywords["skill_stats"],
+            "ats_recommendations": self._list_ats_recommendations(
+                stats=keywords["skill_stats"], resume_text=resume.content
+            ),
+        }
 
-        yield f"data: {json.dumps({'status': 'starting', 'message': 'Analyzing resume and job description...'})}\n\n"
-        await asyncio.sleep(2)
+    async def _get_jobs(
+        self, job_ids: List[str]
+    ) -> Tuple[List[Tuple[Job, ProcessedJob]], List[Dict[str, str]]]:
+        """
+        Fetches many jobs with their processed rows in a single query.
+        Returns the valid pairs (in `job_ids` order) and a list of skipped
+        jobs with the reason.
+        """
+        query = (
+            select(Job, ProcessedJob)
+            .outerjoin(ProcessedJob, ProcessedJob.job_id == Job.job_id)
+            .where(Job.job_id.in_(job_ids))
+        )
+        result = await self.db.execute(query)
+        rows = {job.job_id: (job, processed_job) for job, processed_job in result.all()}
+
+        found: List[Tuple[Job, ProcessedJob]] = []
+        skipped: List[Dict[str, str]] = []
+        for job_id in dict.fromkeys(job_ids):
+            try:
+                if job_id not in rows:
+                    raise JobNotFoundError(job_id=job_id)
+                job, processed_job = rows[job_id]
+                if processed_job is None:
+                    raise JobParsingError(job_id=job_id)
+                self._validate_job_keywords(processed_job, job_id)
+            except (JobNotFoundError, JobParsingError, JobKeywordExtractionError) as e:
+                skipped.append({"job_id": job_id, "reason": str(e)})
+                continue
+            found.append((job, processed_job))
+        return found, skipped
 
-        resume, processed_resume = await self._get_resume(resume_id)
-        job, processed_job = await self._get_job(job_id)
+    async def score_many(
+        self, resume_id: str, job_ids: List[str], baseline: str = "embedding"
+    ) -> Dict:
+        """
+        Scores one resume against many jobs without any LLM call.
+
+        Jobs are fetched with one query, the resume (or its section chunks)
+        and every job keyword string are embedded with one batched
+        (cache-aware) call, and all scores come from a single matrix product
+        over L2-normalised float32 vectors. Results are ranked by score, highest first, and carry
+        the per-job skill overlap. `baseline="lexical"` scores with the
+        offline lexical vectors instead, as `score` does.
+        """
+        resume, _ = await self._get_resume(resume_id)
+        jobs, skipped = await self._get_jobs(job_ids)
+        if not jobs:
+            return {"resume_id": resume_id, "baseline": baseline, "results": [], "skipped": skipped}
+
+        job_keywords = [
+            self._normalize_keyword_list(
+                json.loads(processed_job.extracted_keywords).get("extracted_keywords", [])
+            )
+            for _, processed_job in jobs
+        ]
+        job_texts = [", ".join(keywords) for keywords in job_keywords]
+        if baseline == "lexical":
+            scores = await self.lexical_baseline_scores(resume.content, job_texts)
+        else:
+            resume_inputs, resume_kinds = self._resume_inputs(resume.content)
+            vectors = await self.embedding_manager.embed_many(resume_inputs + job_texts)
+            matrix = np.asarray(vectors, dtype=np.float32)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix /= np.where(norms > 0, norms, 1.0)
+            # (jobs x resume inputs): one column per chunk in "sections" mode.
+            chunk_scores = matrix[len(resume_inputs) :] @ matrix[: len(resume_inputs)].T
+            scores = self._aggregate_resume_scores(resume_kinds, chunk_scores)
+
+        resume_norm = self._prepare_text_for_matching(resume.content)
+        results = []
+        for (job, processed_job), keywords, score in zip(jobs, job_keywords, scores):
+            missing: List[str] = []
+            if keywords:
+                matcher = get_keyword_matcher(tuple(keyword.lower() for keyword in keywords))
+                resume_counts = matcher.count(resume_norm)
+                missing = [kw for kw, count in zip(keywords, resume_counts) if not count]
+            results.append(
+                {
+                    "job_id": job.job_id,
+                    "job_title": processed_job.job_title,
+                    "score": float(score),
+                    "skill_overlap": {
+                        "matched": len(keywords) - len(missing),
+                        "total": len(keywords),
+                        # Normalisation can leave no usable keywords.
+                        "ratio": (len(keywords) - len(missing)) / len(keywords) if keywords else 0.0,
+                        "missing": missing,
+                    },
+                }
+            )
+        results.sort(key=lambda item: item["score"], reverse=True)
+        for rank, item in enumerate(results, start=1):
+            item["rank"] = rank
 
-        yield f"data: {json.dumps({'status': 'parsing', 'message': 'Parsing resume content...'})}\n\n"
-        await asyncio.sleep(2)
+        return {"resume_id": resume_id, "baseline": baseline, "results": results, "skipped": skipped}
 
-        job_keywords_raw = json.loads(processed_job.extracted_keywords).get(
-            "extracted_keywords", []
-        )
-        resume_keywords_raw = json.loads(processed_resume.extracted_keywords).get(
-            "extracted_keywords", []
+    def _improvement_run_key(self, resume_content: str, job_content: str) -> Dict[str, str]:
+        """
+        Identity of an improvement result: content hashes of the inputs, a
+        version hash of every prompt, schema and scoring setting that shapes
+        the output, and the LLM / embedding models.
+        """
+        prompt_payload = json.dumps(
+            [
+                [prompt_factory.get(name) for name in _IMPROVEMENT_PROMPTS],
+                [json_schema_factory.get(name) for name in _IMPROVEMENT_SCHEMAS],
+                self.scoring_mode,
+                settings.RESUME_SECTION_WEIGHTS,
+            ],
+            sort_keys=True,
         )
+        return {
+            "resume_content_hash": hashlib.sha256(resume_content.encode("utf-8")).hexdigest(),
+            "job_content_hash": hashlib.sha256(job_content.encode("utf-8")).hexdigest(),
+            "prompt_version": hashlib.sha256(prompt_payload.encode("utf-8")).hexdigest()[:16],
+            "model": (
+                f"{self.md_agent_manager.model_provider}:{self.md_agent_manager.model}"
+                f"|{self.embedding_manager.cache_model}"
+            ),
+        }
 
-        job_keywords_list = self._normalize_keyword_list(job_keywords_raw)
-        resume_keywords_list = self._normalize_keyword_list(resume_keywords_raw)
+    async def _find_improvement_run(self, resume_id: str, job_id: str) -> Dict | None:
+        """
+        Returns the stored result for the current resume and job contents,
+        or None. Missing rows are left for the pipeline to report.
+        """
+        resume_content = (
+            await self.db.execute(select(Resume.content).where(Resume.resume_id == resume_id))
+        ).scalar()
+        job_content = (
+            await self.db.execute(select(Job.content).where(Job.job_id == job_id))
+        ).scalar()
+        if resume_content is None or job_content is None:
+            return None
 
-        extracted_job_keywords = ", ".join(job_keywords_list)
+        key = self._improvement_run_key(resume_content, job_content)
+        query = select(ImprovementRun.result).filter_by(**key)
+        result = (await self.db.execute(query)).scalar()
+        if result is None:
+            metrics.incr("improvement_runs.misses")
+            return None
 
-        extracted_resume_keywords = ", ".join(resume_keywords_list)
+        metrics.incr("improvement_runs.hits")
+        logger.info(f"Serving stored improvement for resume {resume_id} / job {job_id}")
+        job_service = JobService(self.db)
+        await job_service.ensure_job_resume_association(job_id, resume_id)
+        return {**result, "resume_id": resume_id, "job_id": job_id}
+
+    async def _store_improvement_run(self, results: Dict, execution: Dict) -> None:
+        resume, _ = results["fetch_resume"]
+        job, _ = results["fetch_job"]
+        key = self._improvement_run_key(resume.content, job.content)
+        values = {
+            "resume_id": execution["resume_id"],
+            "job_id": execution["job_id"],
+            "result": execution,
+        }
+        # An upsert, so two identical runs finishing together both succeed
+        # instead of one failing on `uq_improvement_runs_key`.
+        stmt = sqlite_insert(ImprovementRun).values(**key, **values)
+        stmt = stmt.on_conflict_do_update(index_elements=list(key), set_=values)
+        await self.db.execute(stmt)
+        await self.db.commit()
+
+    async def run(self, resume_id: str, job_id: str, force: bool = False) -> Dict:
+        """
+        Main method to run the scoring and improving process and return dict.
 
-        skill_stats_for_prompt = self._build_skill_comparison(
-            keywords=job_keywords_list,
-            resume_text=resume.content,
-            job_text=job.content,
-        )
-        ats_recommendations = self._build_ats_recommendations(
-            stats=skill_stats_for_prompt,
-            resume_text=resume.content,
-        )
-        skill_priority_text = self._build_skill_priority_text(skill_stats_for_prompt)
+        A result stored for the same resume and job contents (and the same
+        prompts and models) is returned as is unless `force` is set.
+        """
+        if not force:
+            stored = await self._find_improvement_run(resume_id, job_id)
+            if stored is not None:
+                return stored
 
-        resume_embedding = await self.embedding_manager.embed(text=resume.content)
-        extracted_job_keywords_embedding = await self.embedding_manager.embed(
-            text=extracted_job_keywords
-        )
+        results = await self._build_pipeline(resume_id, job_id).execute()
 
-        yield f"data: {json.dumps({'status': 'scoring', 'message': 'Calculating compatibility score...'})}\n\n"
-        await asyncio.sleep(3)
+        logger.info(f"Resume Preview: {results['preview']}")
 
-        cosine_similarity_score = self.calculate_cosine_similarity(
-            extracted_job_keywords_embedding, resume_embedding
-        )
+        execution = self._build_execution(resume_id, job_id, results)
+        await self._store_improvement_run(results, execution)
 
-        yield f"data: {json.dumps({'status': 'scored', 'score': cosine_similarity_score})}\n\n"
+        gc.collect()
 
-        yield f"data: {json.dumps({'status': 'improving', 'message': 'Generating improvement suggestions...'})}\n\n"
-        await asyncio.sleep(3)
+        return execution
 
-        updated_resume, updated_score = await self.improve_score_with_llm(
-            resume=resume.content,
-            extracted_resume_keywords=extracted_resume_keywords,
-            job=job.content,
-            extracted_job_keywords=extracted_job_keywords,
-            previous_cosine_similarity_score=cosine_similarity_score,
-            extracted_job_keywords_embedding=extracted_job_keywords_embedding,
-            ats_recommendations=ats_recommendations,
-            skill_priority_text=skill_priority_text,
+    async def enqueue_run(
+        self, resume_id: str, job_id: str, force: bool = False, user_id: Optional[str] = None
+    ) -> str:
+        """
+        Queues `run` as a durable `resume.improve` task owned by `user_id` and
+        returns its id; the result is stored on the task.
+        """
+        task_id = await enqueue_task(
+            self.db,
+            IMPROVEMENT_TASK,
+            {"resume_id": resume_id, "job_id": job_id, "force": force, "user_id": user_id},
         )
+        await self.db.commit()
+        return task_id
 
-        resume_preview = await self.get_resume_for_previewer(
-            updated_resume=updated_resume
-        )
+    async def run_and_stream(
+        self, resume_id: str, job_id: str, force: bool = False
+    ) -> AsyncGenerator:
+        """
+        Runs the same pipeline as `run` and streams a Server-Sent Event as each
+        stage completes (see `run_events`).
+        """
+        async for payload in self.run_events(resume_id, job_id, force=force):
+            yield f"data: {json.dumps(payload)}\n\n"
 
-        resume_analysis = await self.get_resume_analysis(
-            original_resume=resume.content,
-            improved_resume=updated_resume,
-            job_description=job.content,
-            extracted_job_keywords=extracted_job_keywords,
-            extracted_resume_keywords=extracted_resume_keywords,
-            original_score=cosine_similarity_score,
-            new_score=updated_score,
+    async def run_events(
+        self, resume_id: str, job_id: str, force: bool = False
+    ) -> AsyncGenerator[Dict, None]:
+        """
+        Runs the same pipeline as `run` and yields a progress event as each
+        stage completes, ending with `completed` carrying the result. Every
+        event carries `elapsed_ms` (since the run started) and `stage_ms`
+        (time since the previous event). A stored result is yielded straight
+        away as `completed` unless `force` is set.
+        """
+        started = time.perf_counter()
+        stage_started = started
+
+        def event(status: str, **fields) -> Dict:
+            nonlocal stage_started
+            now = time.perf_counter()
+            payload = {
+                "status": status,
+                **fields,
+                "elapsed_ms": round((now - started) * 1000, 1),
+                "stage_ms": round((now - stage_started) * 1000, 1),
+            }
+            stage_started = now
+            return payload
+
+        yield event("starting", message="Analyzing resume and job description...")
+
+        if not force:
+            stored = await self._find_improvement_run(resume_id, job_id)
+            if stored is not None:
+                yield event("completed", result=stored, stored=True)
+                return
+
+        # Stage completions and improvement deltas share one queue, so deltas
+        # are forwarded while the pipeline is still running.
+        updates: asyncio.Queue = asyncio.Queue()
+        pipeline = self._build_pipeline(
+            resume_id,
+            job_id,
+            on_delta=lambda attempt, text: updates.put_nowait(("delta", (attempt, text))),
         )
 
-        skill_comparison = self._build_skill_comparison(
-            keywords=job_keywords_list,
-            resume_text=updated_resume,
-            job_text=job.content,
-        )
+        async def drive() -> None:
+            async for name, _ in pipeline.stream():
+                updates.put_nowait(("stage", name))
 
+        driver = asyncio.create_task(drive())
+        driver.add_done_callback(lambda _: updates.put_nowait(None))
+        analysis_stages = {"preview", "analysis", "skill_comparison"}
+        try:
+            while (item := await updates.get()) is not None:
+                kind, value = item
+                if kind == "delta":
+                    attempt, text = value
+                    yield {"status": "improving.delta", "attempt": attempt, "delta": text}
+                elif value == "keyword_stats":
+                    yield event("parsing", message="Parsed resume and job description.")
+                elif value == "embeddings":
+                    cosine_similarity_score, _ = pipeline.results["embeddings"]
+                    yield event("scoring", message="Calculated compatibility score.")
+                    yield event("scored", score=cosine_similarity_score)
+                    yield event("improving", message="Generating improvement suggestions...")
+                elif value == "improve":
+                    _, updated_score = pipeline.results["improve"]
+                    yield event("improved", score=updated_score)
+                elif value in analysis_stages:
+                    analysis_stages.discard(value)
+                    if not analysis_stages:
+                        yield event("analyzed", message="Generated preview and analysis.")
+            # Surfaces any stage failure.
+            await driver
+        finally:
+            # The client may disconnect mid-stream; don't leave stages running.
+            if not driver.done():
+                driver.cancel()
+
+        results = pipeline.results
+        resume_analysis = results["analysis"]
         if resume_analysis and resume_analysis.get("improvements"):
             for i, suggestion in enumerate(resume_analysis["improvements"]):
-                payload = {
-                    "status": "suggestion",
-                    "index": i,
-                    "text": suggestion.get("suggestion", ""),
-                    "reference": suggestion.get("lineNumber"),
-                }
-                yield f"data: {json.dumps(payload)}\n\n"
-                await asyncio.sleep(0.2)
+                yield event(
+                    "suggestion",
+                    index=i,
+                    text=suggestion.get("suggestion", ""),
+                    reference=suggestion.get("lineNumber"),
+                )
 
-        final_result = {
-            "resume_id": resume_id,
-            "job_id": job_id,
-            "original_score": cosine_similarity_score,
-            "new_score": updated_score,
-            "updated_resume": markdown.markdown(text=updated_resume),
-            "resume_preview": resume_preview,
-            "details": resume_analysis.get("details") if resume_analysis else "",
-            "commentary": resume_analysis.get("commentary") if resume_analysis else "",
-            "improvements": resume_analysis.get("improvements") if resume_analysis else [],
-            "original_resume_markdown": resume.content,
-            "updated_resume_markdown": updated_resume,
-            "job_description": job.content,
-            "job_keywords": extracted_job_keywords,
-            "skill_comparison": skill_comparison,
-        }
+        final_result = self._build_execution(resume_id, job_id, results)
+        await self._store_improvement_run(results, final_result)
 
-        yield f"data: {json.dumps({'status': 'completed', 'result': final_result})}\n\n"
+        yield event("completed", result=final_result)
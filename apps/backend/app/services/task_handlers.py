@@ -0,0 +1,89 @@
+"""
+Handlers for the durable task queue. Each one re-runs a piece of LLM work
+that the services would otherwise do inline; all of them are safe to retry.
+"""
+from typing import Any, Dict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Job, ProcessedJob, ProcessedResume, Resume
+from app.schemas.pydantic import LearningScheduleRequest
+from .job_service import JobService
+from .resume_service import ResumeService
+from .score_improvement_service import ScoreImprovementService
+from .learning_schedule_service import LearningScheduleService
+from .exceptions import JobNotFoundError, JobParsingError, ResumeNotFoundError
+from .task_queue import (
+    IMPROVEMENT_TASK,
+    JOB_EXTRACTION_TASK,
+    LEARNING_SCHEDULE_TASK,
+    RESUME_EXTRACTION_TASK,
+    task_handler,
+)
+
+
+async def _resume_extraction_failed(db: AsyncSession, payload: Dict[str, Any], error: str) -> None:
+    await ResumeService(db).set_processing_status(payload["resume_id"], "failed", error=error)
+
+
+@task_handler(
+    RESUME_EXTRACTION_TASK,
+    permanent_errors=(ResumeNotFoundError,),
+    on_failure=_resume_extraction_failed,
+)
+async def extract_resume(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    resume_id = payload["resume_id"]
+    resume = await db.scalar(select(Resume).where(Resume.resume_id == resume_id))
+    if resume is None:
+        raise ResumeNotFoundError(resume_id=resume_id)
+    service = ResumeService(db)
+    if await db.scalar(select(ProcessedResume.resume_id).where(ProcessedResume.resume_id == resume_id)):
+        # An earlier attempt committed before its worker went away.
+        await service.set_processing_status(resume_id, "ready")
+        return {"resume_id": resume_id, "skipped": True}
+
+    resume_text = resume.content
+    await service.set_processing_status(resume_id, "processing")
+    await service._extract_and_store_structured_resume(
+        resume_id=resume_id, resume_text=resume_text, user_id=payload.get("user_id")
+    )
+    await service.set_processing_status(resume_id, "ready")
+    await service._index_resume(resume_id)
+    return {"resume_id": resume_id}
+
+
+@task_handler(JOB_EXTRACTION_TASK, permanent_errors=(JobNotFoundError,))
+async def extract_job(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    job_id = payload["job_id"]
+    job = await db.scalar(select(Job).where(Job.job_id == job_id))
+    if job is None:
+        raise JobNotFoundError(job_id=job_id)
+    if await db.scalar(select(ProcessedJob.job_id).where(ProcessedJob.job_id == job_id)):
+        return {"job_id": job_id, "skipped": True}
+
+    service = JobService(db)
+    stored = await service._extract_and_store_structured_job(
+        job_id=job_id, job_description_text=job.content, user_id=payload.get("user_id")
+    )
+    if stored is None:
+        # Inline uploads tolerate this; a task retries the extraction instead.
+        raise JobParsingError(job_id=job_id)
+    await service._index_jobs([job_id])
+    return {"job_id": job_id}
+
+
+@task_handler(IMPROVEMENT_TASK, permanent_errors=(ResumeNotFoundError, JobNotFoundError))
+async def improve_resume(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await ScoreImprovementService(db=db).run(
+        resume_id=payload["resume_id"],
+        job_id=payload["job_id"],
+        force=payload.get("force", False),
+    )
+
+
+@task_handler(LEARNING_SCHEDULE_TASK, permanent_errors=(ResumeNotFoundError, JobNotFoundError))
+async def generate_learning_schedule(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    request = LearningScheduleRequest.model_validate(payload)
+    schedule = await LearningScheduleService(db).generate_learning_schedule(request)
+    return schedule.model_dump(mode="json")
@@ -0,0 +1,446 @@
+import uuid
+import random
+import asyncio
+import logging
+
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import metrics
+from app.models import Task
+
+logger = logging.getLogger(__name__)
+
+TaskHandlerFn = Callable[[AsyncSession, Dict[str, Any]], Awaitable[Any]]
+TaskFailureFn = Callable[[AsyncSession, Dict[str, Any], str], Awaitable[None]]
+
+RESUME_EXTRACTION_TASK = "resume.extract"
+JOB_EXTRACTION_TASK = "job.extract"
+IMPROVEMENT_TASK = "resume.improve"
+LEARNING_SCHEDULE_TASK = "learning_schedule.generate"
+
+_LEASE_EXPIRED = "Lease expired on the final attempt."
+
+# A claim can lose the race to another worker; try the next candidate.
+_CLAIM_ATTEMPTS = 5
+
+
+@dataclass(frozen=True)
+class TaskHandler:
+    fn: TaskHandlerFn
+    # Errors that retrying cannot fix (e.g. a deleted resume); fail at once.
+    permanent_errors: Tuple[Type[BaseException], ...] = ()
+    # Called once with (db, payload, error) when the task has failed for good.
+    on_failure: Optional[TaskFailureFn] = None
+
+
+_HANDLERS: Dict[str, TaskHandler] = {}
+
+
+def task_handler(
+    task_type: str,
+    permanent_errors: Iterable[Type[BaseException]] = (),
+    on_failure: Optional[TaskFailureFn] = None,
+) -> Callable[[TaskHandlerFn], TaskHandlerFn]:
+    """
+    Registers `fn(db, payload)` as the handler for `task_type`. Its return
+    value must be JSON-serialisable; it is stored as the task result.
+    `on_failure(db, payload, error)` runs when the task fails for good.
+    """
+
+    def register(fn: TaskHandlerFn) -> TaskHandlerFn:
+        _HANDLERS[task_type] = TaskHandler(
+            fn=fn, permanent_errors=tuple(permanent_errors), on_failure=on_failure
+        )
+        return fn
+
+    return register
+
+
+def registered_task_types() -> List[str]:
+    return sorted(_HANDLERS)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def enqueue_task(
+    db: AsyncSession,
+    task_type: str,
+    payload: Dict[str, Any],
+    max_attempts: Optional[int] = None,
+    delay_seconds: float = 0,
+) -> str:
+    """
+    Adds a task to `db`'s transaction and returns its id. The caller commits,
+    so a task is stored together with the rows it refers to, or not at all.
+    """
+    task_id = str(uuid.uuid4())
+    db.add(
+        Task(
+            task_id=task_id,
+            task_type=task_type,
+            payload=payload,
+            status="queued",
+            attempts=0,
+            max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+            run_after=_utcnow() + timedelta(seconds=delay_seconds),
+        )
+    )
+    await db.flush()
+    metrics.incr("tasks.enqueued")
+    logger.info(f"Enqueued task {task_id} ({task_type})")
+    return task_id
+
+
+def _task_dict(task: Task, include_result: bool = True) -> Dict[str, Any]:
+    return {
+        "task_id": task.task_id,
+        "task_type": task.task_type,
+        "status": task.status,
+        "attempts": task.attempts,
+        "max_attempts": task.max_attempts,
+        "run_after": task.run_after.isoformat() if task.run_after else None,
+        "lease_expires_at": task.lease_expires_at.isoformat() if task.lease_expires_at else None,
+        "result": task.result if include_result else None,
+        "error": task.error,
+        "finished_at": task.finished_at.isoformat() if task.finished_at else None,
+    }
+
+
+class TaskQueue:
+    """
+    Durable task queue stored in the application database.
+
+    Workers (in any number of processes sharing the database) `claim` a task
+    by taking a lease on it with a conditional UPDATE, so only one of them
+    wins. The lease is renewed with `heartbeat` while the handler runs; when
+    a worker dies, its lease expires and another worker picks the task up.
+    A failed attempt is re-queued with exponential backoff until the task
+    runs out of attempts.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+        lease_seconds: float = 120,
+        backoff_seconds: float = 5,
+        backoff_max_seconds: float = 300,
+    ) -> None:
+        self.session_factory = session_factory
+        self.lease_seconds = lease_seconds
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+
+    async def claim(
+        self, worker_id: str, task_types: Optional[Iterable[str]] = None
+    ) -> Optional[Task]:
+        """
+        Leases the next runnable task (queued and due, or running with an
+        expired lease) to `worker_id`, or returns None when there is none.
+        """
+        now = _utcnow()
+        claimable = or_(
+            and_(Task.status == "queued", Task.run_after <= now),
+            and_(Task.status == "running", Task.lease_expires_at < now),
+        )
+        if task_types is not None:
+            claimable = and_(claimable, Task.task_type.in_(list(task_types)))
+
+        async with self.session_factory() as db:
+            # A task whose last lease expired on its final attempt is dead.
+            dead = and_(
+                Task.status == "running",
+                Task.lease_expires_at < now,
+                Task.attempts >= Task.max_attempts,
+            )
+            expired = (await db.execute(select(Task.task_id, Task.task_type, Task.payload).where(dead))).all()
+            for task_id, task_type, payload in expired:
+                reaped = await db.execute(
+                    update(Task)
+                    .where(Task.task_id == task_id, dead)
+                    .values(
+                        status="failed",
+                        error=_LEASE_EXPIRED,
+                        lease_owner=None,
+                        lease_expires_at=None,
+                        finished_at=now,
+                    )
+                )
+                await db.commit()
+                if reaped.rowcount == 1:
+                    metrics.incr("tasks.failed")
+                    await self._on_failure(task_type, payload, _LEASE_EXPIRED)
+            for _ in range(_CLAIM_ATTEMPTS):
+                task_id = await db.scalar(
+                    select(Task.task_id).where(claimable).order_by(Task.run_after).limit(1)
+                )
+                if task_id is None:
+                    break
+                claimed = await db.execute(
+                    update(Task)
+                    .where(Task.task_id == task_id, claimable)
+                    .values(
+                        status="running",
+                        lease_owner=worker_id,
+                        lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                        attempts=Task.attempts + 1,
+                    )
+                )
+                if claimed.rowcount == 1:
+                    await db.commit()
+                    metrics.incr("tasks.claimed")
+                    return await db.scalar(
+                        select(Task)
+                        .where(Task.task_id == task_id)
+                        .execution_options(populate_existing=True)
+                    )
+                metrics.incr("tasks.claim_conflicts")
+            await db.commit()
+        return None
+
+    async def heartbeat(self, task_id: str, worker_id: str) -> bool:
+        """Extends the lease; False if the task is no longer leased to us."""
+        async with self.session_factory() as db:
+            renewed = await db.execute(
+                update(Task)
+                .where(Task.task_id == task_id, Task.lease_owner == worker_id, Task.status == "running")
+                .values(lease_expires_at=_utcnow() + timedelta(seconds=self.lease_seconds))
+            )
+            await db.commit()
+        return renewed.rowcount == 1
+
+    async def complete(self, task: Task, worker_id: str, result: Any) -> bool:
+        async with self.session_factory() as db:
+            done = await db.execute(
+                update(Task)
+                .where(Task.task_id == task.task_id, Task.lease_owner == worker_id)
+                .values(
+                    status="succeeded",
+                    result=result,
+                    error=None,
+                    lease_owner=None,
+                    lease_expires_at=None,
+                    finished_at=_utcnow(),
+                )
+            )
+            await db.commit()
+        if done.rowcount != 1:
+            logger.warning(f"Task {task.task_id} finished after its lease was lost")
+            return False
+        metrics.incr("tasks.succeeded")
+        return True
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** max(attempts - 1, 0))
+        # Jitter so tasks that failed together do not retry together.
+        return delay * random.uniform(0.5, 1.0)
+
+    async def fail(self, task: Task, worker_id: str, error: str, permanent: bool = False) -> bool:
+        """
+        Re-queues the task with backoff, or marks it failed when it has used
+        all its attempts (or `permanent` is set).
+        """
+        now = _utcnow()
+        final = permanent or task.attempts >= task.max_attempts
+        if final:
+            values = dict(status="failed", finished_at=now)
+        else:
+            values = dict(status="queued", run_after=now + timedelta(seconds=self._backoff(task.attempts)))
+        async with self.session_factory() as db:
+            updated = await db.execute(
+                update(Task)
+                .where(Task.task_id == task.task_id, Task.lease_owner == worker_id)
+                .values(error=error, lease_owner=None, lease_expires_at=None, **values)
+            )
+            await db.commit()
+        if updated.rowcount != 1:
+            return False
+        metrics.incr("tasks.failed" if final else "tasks.retried")
+        if final:
+            await self._on_failure(task.task_type, task.payload, error)
+        return True
+
+    async def _on_failure(self, task_type: str, payload: Dict[str, Any], error: str) -> None:
+        handler = _HANDLERS.get(task_type)
+        if handler is None or handler.on_failure is None:
+            return
+        try:
+            async with self.session_factory() as db:
+                await handler.on_failure(db, payload, error)
+        except Exception as e:
+            logger.error(f"Failure hook for {task_type} task failed: {e}")
+
+    async def get(self, task_id: str, owner_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the task, or None if it does not exist or (with `owner_id`)
+        was not enqueued for that user.
+        """
+        async with self.session_factory() as db:
+            task = await db.get(Task, task_id)
+            if task is None:
+                return None
+            if owner_id is not None and (task.payload or {}).get("user_id") != owner_id:
+                return None
+            return _task_dict(task)
+
+    async def backlog(self, recent_failures: int = 10) -> Dict[str, Any]:
+        """
+        Admin view: task counts per type and status, the age of the oldest
+        due task, expired leases, and the most recent failures. Failed tasks
+        belong to many users, so pass `recent_failures=0` to leave them out
+        when the caller is not an operator.
+        """
+        now = _utcnow()
+        async with self.session_factory() as db:
+            rows = await db.execute(
+                select(Task.task_type, Task.status, func.count())
+                .group_by(Task.task_type, Task.status)
+            )
+            counts: Dict[str, Dict[str, int]] = {}
+            for task_type, status, count in rows:
+                counts.setdefault(task_type, {})[status] = count
+
+            oldest_due = await db.scalar(
+                select(func.min(Task.run_after)).where(Task.status == "queued", Task.run_after <= now)
+            )
+            expired_leases = await db.scalar(
+                select(func.count()).where(Task.status == "running", Task.lease_expires_at < now)
+            )
+            recent = None
+            if recent_failures > 0:
+                failures = await db.scalars(
+                    select(Task)
+                    .where(Task.status == "failed")
+                    .order_by(Task.finished_at.desc())
+                    .limit(recent_failures)
+                )
+                # Results can hold user data; the backlog only needs the errors.
+                recent = [_task_dict(task, include_result=False) for task in failures]
+
+        totals: Dict[str, int] = {}
+        for statuses in counts.values():
+            for status, count in statuses.items():
+                totals[status] = totals.get(status, 0) + count
+        metrics.set_gauge("tasks.queued", totals.get("queued", 0))
+        metrics.set_gauge("tasks.running", totals.get("running", 0))
+        backlog: Dict[str, Any] = {
+            "totals": totals,
+            "by_type": counts,
+            "oldest_due_seconds": (now - oldest_due).total_seconds() if oldest_due else 0.0,
+            "expired_leases": expired_leases or 0,
+            "handlers": registered_task_types(),
+        }
+        if recent is not None:
+            backlog["recent_failures"] = recent
+        return backlog
+
+
+class TaskWorker:
+    """
+    Async worker loop: `concurrency` slots each claim a task, run its
+    handler with a fresh database session while renewing the lease, and
+    record the result. Run several processes (`python -m app.cli
+    task-worker`) to scale out on one node; they coordinate through leases.
+    """
+
+    def __init__(
+        self,
+        queue: "TaskQueue",
+        concurrency: int = 1,
+        poll_interval: float = 1.0,
+        worker_id: Optional[str] = None,
+    ) -> None:
+        self.queue = queue
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"worker-{uuid.uuid4().hex[:12]}"
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._slot(), name=f"{self.worker_id}-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(
+            f"Task worker {self.worker_id} started with {self.concurrency} slots "
+            f"for {', '.join(registered_task_types()) or 'no task types'}"
+        )
+
+    async def stop(self) -> None:
+        """Stops claiming; running handlers are cancelled and their leases expire."""
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_forever(self) -> None:
+        await self.start()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _slot(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                task = await self.queue.claim(self.worker_id, task_types=registered_task_types())
+            except Exception as e:
+                logger.error(f"Task claim failed: {e}")
+                task = None
+            if task is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.run_task(task)
+
+    async def _keep_leased(self, task: Task) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await self.queue.heartbeat(task.task_id, self.worker_id):
+                logger.warning(f"Lost the lease on task {task.task_id}")
+                return
+
+    async def run_task(self, task: Task) -> None:
+        handler = _HANDLERS.get(task.task_type)
+        if handler is None:
+            await self.queue.fail(task, self.worker_id, f"No handler for task type {task.task_type}", permanent=True)
+            return
+
+        heartbeat = asyncio.create_task(self._keep_leased(task))
+        try:
+            async with self.queue.session_factory() as db:
+                result = await handler.fn(db, task.payload)
+            await self.queue.complete(task, self.worker_id, result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            permanent = isinstance(e, handler.permanent_errors)
+            logger.error(
+                f"Task {task.task_id} ({task.task_type}) attempt {task.attempts}/{task.max_attempts} failed: {e}"
+            )
+            await self.queue.fail(task, self.worker_id, str(e) or type(e).__name__, permanent=permanent)
+        finally:
+            heartbeat.cancel()
+
+
+@lru_cache(maxsize=1)
+def get_task_queue() -> TaskQueue:
+    """Create (or return) the process-wide task queue."""
+    return TaskQueue(
+        lease_seconds=settings.TASK_LEASE_SECONDS,
+        backoff_seconds=settings.TASK_RETRY_BACKOFF_SECONDS,
+        backoff_max_seconds=settings.TASK_RETRY_BACKOFF_MAX_SECONDS,
+    )
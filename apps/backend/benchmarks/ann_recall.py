@@ -0,0 +1,84 @@
+"""
+Recall / throughput benchmark: IVF approximate search vs. exact search.
+
+Builds a synthetic clustered corpus of L2-normalised vectors (shaped like job
+embeddings: many near-duplicates around a few thousand topics), stores it in
+a VectorCollection with the IVF index enabled, and reports recall@k and
+queries per second for several `nprobe` values against exact search.
+
+Usage (from apps/backend):
+    python -m benchmarks.ann_recall
+    python -m benchmarks.ann_recall --rows 200000 --dim 384 --nprobe 4 8 16 32 64
+"""
+import time
+import tempfile
+import argparse
+
+import numpy as np
+
+import app.core  # noqa: F401  (initialises app.core before app.agent)
+from app.services.embedding_store import VectorCollection
+
+
+def _make_corpus(rows: int, dim: int, topics: int, noise: float, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    labels = rng.integers(0, topics, size=rows)
+    corpus = centers[labels] + noise * rng.standard_normal((rows, dim)).astype(np.float32)
+    return corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--topics", type=int, default=2000)
+    parser.add_argument("--noise", type=float, default=1.5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=None, help="IVF lists (default 4*sqrt(rows))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64, 128])
+    args = parser.parse_args()
+
+    corpus = _make_corpus(args.rows, args.dim, args.topics, args.noise, seed=0)
+    queries = _make_corpus(args.queries, args.dim, args.topics, args.noise, seed=0)
+    # Perturb so queries are not exact corpus members.
+    queries = queries + 0.05 * np.random.default_rng(1).standard_normal(queries.shape).astype(np.float32)
+    ids = [f"job-{i}" for i in range(args.rows)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        collection = VectorCollection(
+            directory, ann=True, ann_min_rows=1, ann_lists=args.lists
+        )
+        started = time.perf_counter()
+        collection.upsert(ids, ids, corpus, model="synthetic")
+        collection.train_ann()
+        print(
+            f"corpus {args.rows}x{args.dim}, {collection._ann.n_lists} lists, "
+            f"build {time.perf_counter() - started:.1f}s"
+        )
+
+        # Exact baseline on the same memory-mapped matrix.
+        started = time.perf_counter()
+        truth = []
+        for query in queries:
+            scores = collection.matrix @ (query / np.linalg.norm(query))
+            top = np.argpartition(-scores, args.k - 1)[: args.k]
+            truth.append({ids[i] for i in top})
+        exact_qps = len(queries) / (time.perf_counter() - started)
+
+        print(f"{'search':>10} {'recall@' + str(args.k):>10} {'QPS':>10} {'speedup':>8}")
+        print(f"{'exact':>10} {1.0:>10.3f} {exact_qps:>10.0f} {1.0:>7.1f}x")
+        collection.search(queries[0], k=args.k)  # warm up the inverted lists
+        for nprobe in args.nprobe:
+            started = time.perf_counter()
+            results = [collection.search(query, k=args.k, nprobe=nprobe) for query in queries]
+            qps = len(queries) / (time.perf_counter() - started)
+            recall = np.mean(
+                [len(expected & {item for item, _ in found}) / args.k for expected, found in zip(truth, results)]
+            )
+            print(f"{'nprobe=' + str(nprobe):>10} {recall:>10.3f} {qps:>10.0f} {qps / exact_qps:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Throughput benchmark: local ONNX embedding provider vs. the OpenAI provider.
+
+The OpenAI side talks to an in-process stand-in (an httpx mock transport that
+returns random vectors after a configurable delay), so the numbers reflect the
+client, batching and request overhead without network variance or cost.
+
+Usage (from apps/backend):
+    python -m benchmarks.embedding_throughput --onnx-model /models/all-MiniLM-L6-v2
+    python -m benchmarks.embedding_throughput --latency-ms 250 --texts 256
+"""
+import time
+import json
+import asyncio
+import argparse
+
+import httpx
+import numpy as np
+
+import app.core  # noqa: F401  (initialises app.core before app.agent)
+
+SAMPLE = (
+    "Senior backend engineer with 6 years of experience building Python and FastAPI "
+    "services, PostgreSQL data models, Kubernetes deployments and CI pipelines. "
+)
+
+
+def _make_texts(n: int) -> list[str]:
+    return [f"{SAMPLE} Candidate #{i}. " * (1 + i % 4) for i in range(n)]
+
+
+def _stand_in_transport(latency_ms: float, dimensions: int) -> httpx.MockTransport:
+    rng = np.random.default_rng(0)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        await asyncio.sleep(latency_ms / 1000)
+        data = [
+            {"object": "embedding", "index": i, "embedding": rng.random(dimensions).tolist()}
+            for i in range(len(inputs))
+        ]
+        return httpx.Response(
+            200,
+            json={
+                "object": "list",
+                "data": data,
+                "model": body["model"],
+                "usage": {"prompt_tokens": 0, "total_tokens": 0},
+            },
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def _openai_provider(latency_ms: float, dimensions: int):
+    from openai import AsyncOpenAI
+    from app.agent.providers.openai import OpenAIEmbeddingProvider
+
+    provider = OpenAIEmbeddingProvider(api_key="benchmark")
+    provider._client = AsyncOpenAI(
+        api_key="benchmark",
+        base_url="http://stand-in.local/v1",
+        http_client=httpx.AsyncClient(transport=_stand_in_transport(latency_ms, dimensions)),
+    )
+    return provider
+
+
+async def _measure(name: str, provider, texts: list[str], batch_size: int) -> None:
+    await provider.embed_many(texts[:2])  # warm-up
+
+    start = time.perf_counter()
+    for text in texts[: min(len(texts), 32)]:
+        await provider.embed(text)
+    single = (time.perf_counter() - start) / min(len(texts), 32)
+
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        await provider.embed_many(texts[i : i + batch_size])
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<24} single: {single * 1000:8.2f} ms/text   "
+        f"batched({batch_size}): {len(texts) / elapsed:10.1f} texts/s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--onnx-model", help="directory with model.onnx and tokenizer.json")
+    parser.add_argument("--texts", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=150.0,
+                        help="simulated OpenAI round-trip latency")
+    parser.add_argument("--dimensions", type=int, default=1536)
+    args = parser.parse_args()
+
+    texts = _make_texts(args.texts)
+    await _measure(
+        f"openai (stand-in {args.latency_ms:.0f}ms)",
+        _openai_provider(args.latency_ms, args.dimensions),
+        texts,
+        args.batch_size,
+    )
+
+    if args.onnx_model:
+        from app.agent.providers.onnx import OnnxEmbeddingProvider
+
+        await _measure("onnx (local cpu)", OnnxEmbeddingProvider(args.onnx_model), texts, args.batch_size)
+    else:
+        print("onnx (local cpu)         skipped: pass --onnx-model to include it")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())